@@ -0,0 +1,24 @@
+"""users createdAt id index
+
+Revision ID: 3f1c2a9d7e41
+Revises: bedbd670c13d
+Create Date: 2026-10-18 12:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7e41'
+down_revision = 'bedbd670c13d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_createdAt_id', 'users', ['createdAt', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_createdAt_id', table_name='users')
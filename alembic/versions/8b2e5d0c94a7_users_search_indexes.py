@@ -0,0 +1,35 @@
+"""users search indexes
+
+Revision ID: 8b2e5d0c94a7
+Revises: 3f1c2a9d7e41
+Create Date: 2026-10-18 14:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e5d0c94a7'
+down_revision = '3f1c2a9d7e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_users_username_trgm', 'users', ['username'], unique=False,
+        postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_users_username_pattern', 'users', ['username'], unique=False,
+        postgresql_ops={'username': 'varchar_pattern_ops'},
+    )
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_email_lower', table_name='users')
+    op.drop_index('ix_users_username_pattern', table_name='users')
+    op.drop_index('ix_users_username_trgm', table_name='users')
@@ -0,0 +1,42 @@
+"""jobs table
+
+Revision ID: c4a7e93f1b26
+Revises: 8b2e5d0c94a7
+Create Date: 2026-10-18 16:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a7e93f1b26'
+down_revision = '8b2e5d0c94a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('maxAttempts', sa.Integer(), nullable=False),
+    sa.Column('runAt', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('lockedAt', sa.TIMESTAMP(), nullable=True),
+    sa.Column('lastError', sa.Text(), nullable=True),
+    sa.Column('isDeleted', sa.Boolean(), nullable=False),
+    sa.Column('createdAt', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updatedAt', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_status_runAt', 'jobs', ['status', 'runAt'], unique=False)
+    op.create_index(op.f('ix_jobs_isDeleted'), 'jobs', ['isDeleted'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_jobs_isDeleted'), table_name='jobs')
+    op.drop_index('ix_jobs_status_runAt', table_name='jobs')
+    op.drop_table('jobs')
@@ -0,0 +1,116 @@
+import hashlib
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Literal, Optional
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.core.cache import TTLCache
+
+
+def weak_etag(*parts: Any) -> str:
+    """Weak validator from identifying values, e.g. `weak_etag(user.id, user.updatedAt)`."""
+    raw = "|".join(part.isoformat() if isinstance(part, datetime) else str(part) for part in parts)
+    return f'W/"{hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of `etag` against the request's If-None-Match header."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: Optional[str] = None) -> Response:
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
+
+
+@dataclass
+class _CachedResponse:
+    body: bytes
+    media_type: Optional[str]
+    headers: Dict[str, str]
+    etag: str
+    expires_at: float
+
+
+@dataclass
+class ResponseCachePolicy:
+    ttl: int
+    visibility: Literal["private", "public"]
+    cache: TTLCache = field(repr=False)
+
+    def key(self, request: Request) -> tuple:
+        key = (request.url.path, request.url.query)
+        if self.visibility == "private":
+            # private entries belong to the credentials that produced them
+            authorization = request.headers.get("authorization", "")
+            key += (hashlib.sha256(authorization.encode()).digest(),)
+        return key
+
+    def cache_control(self, expires_at: float) -> str:
+        return f"{self.visibility}, max-age={max(int(expires_at - time.time()), 0)}"
+
+
+def cache_response(ttl: int, visibility: Literal["private", "public"] = "private", max_size: int = 1024):
+    """Cache a GET response per worker for `ttl` seconds (needs `CacheableRoute`)."""
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__response_cache__ = ResponseCachePolicy(
+            ttl=ttl, visibility=visibility, cache=TTLCache(max_size=max_size, ttl=ttl)
+        )
+        return endpoint
+
+    return decorator
+
+
+class CacheableRoute(APIRoute):
+    """Route class that serves endpoints marked with `cache_response` from their cache."""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        policy: Optional[ResponseCachePolicy] = getattr(self.endpoint, "__response_cache__", None)
+        if policy is None:
+            return handler
+
+        async def cached_handler(request: Request) -> Response:
+            if request.method not in ("GET", "HEAD"):
+                return await handler(request)
+
+            key = policy.key(request)
+            entry: Optional[_CachedResponse] = None
+            if "no-cache" not in request.headers.get("cache-control", ""):
+                entry = policy.cache.get(key)
+
+            if entry is None:
+                response = await handler(request)
+                if response.status_code != 200 or not hasattr(response, "body"):
+                    return response
+                entry = _CachedResponse(
+                    body=response.body,
+                    media_type=response.media_type,
+                    headers={
+                        name: value for name, value in response.headers.items()
+                        if name not in ("content-length", "content-type")
+                    },
+                    etag=f'W/"{hashlib.blake2b(response.body, digest_size=12).hexdigest()}"',
+                    expires_at=time.time() + policy.ttl,
+                )
+                policy.cache.set(key, entry)
+
+            cache_control = policy.cache_control(entry.expires_at)
+            if etag_matches(request, entry.etag):
+                return not_modified(entry.etag, cache_control)
+            headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": cache_control}
+            return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+        return cached_handler
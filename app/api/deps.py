@@ -1,15 +1,16 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-import jwt
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.core import security
 from app.core.config import settings
+from app.core.logging import bind_request_user
 from app.models.user import User
 from app.crud.user import crud_user
-from app.schemas.token import TokenPayload
+from app.services.hashing import password_hasher
+from app.services.rate_limit import rate_limiter
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
@@ -23,16 +24,43 @@ async def get_current_user(
         detail="Could not validate credentials",
     )
     try:
-        payload = jwt.decode(token, settings.ACCESS_SECRET_KEY, algorithms=[security.ALGORITHM])
-        token_data = TokenPayload(**payload)
+        token_data = security.decode_access_token(token)
     except (ValidationError, InvalidTokenError):
         raise credentials_exception
     
-    user = await crud_user.get(db, id=int(token_data.sub))
+    user = await crud_user.get_principal(db, id=int(token_data.sub))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     if not user.isActive or user.isDeleted:
         raise HTTPException(status_code=400, detail="Inactive user")
-    
-    return user
\ No newline at end of file
+
+    bind_request_user(user.id)
+    return user
+
+
+def rate_limit(route: str, bcrypt: bool = True):
+    """Token buckets per route, client IP and email, then the bcrypt queue check."""
+
+    async def dependency(request: Request):
+        await rate_limiter.check(
+            "route", route, "*", settings.RATE_LIMIT_ROUTE_RATE, settings.RATE_LIMIT_ROUTE_BURST
+        )
+        client = request.client.host if request.client else "unknown"
+        await rate_limiter.check(
+            "ip", route, client, settings.RATE_LIMIT_IP_RATE, settings.RATE_LIMIT_IP_BURST
+        )
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        email = body.get("email") if isinstance(body, dict) else None
+        if isinstance(email, str):
+            await rate_limiter.check(
+                "email", route, email.strip().lower(),
+                settings.RATE_LIMIT_EMAIL_RATE, settings.RATE_LIMIT_EMAIL_BURST,
+            )
+        if bcrypt:
+            password_hasher.admit()
+
+    return dependency
@@ -1,57 +1,75 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from app.crud.user import crud_user
 from app.schemas.user import ResetPasswordConfirm, ResetPasswordRequest, User, UserCreate, UserLogin, UserPassword
 from app.schemas.token import RefreshToken, Token
-from app.core.security import create_reset_token, generate_tokens, get_password_hash, validate_refresh_token, verify_reset_token
-from app.api.deps import get_current_user, get_db
+from app.core.security import generate_tokens, validate_refresh_token, verify_reset_token
+from app.core.logging import logger
+from app.services.email import queue_reset_email
+from app.services.hashing import password_hasher
+from app.api.caching import CacheableRoute, etag_matches, not_modified, weak_etag
+from app.api.deps import get_current_user, get_db, rate_limit
 
-router = APIRouter()
+router = APIRouter(route_class=CacheableRoute)
 
 
-@router.post("/signup", response_model=User)
+@router.post("/signup", response_model=User, dependencies=[Depends(rate_limit("signup"))])
 async def signup(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
-    filters = {
-        "email":(user_in.email, "=")
-    }
-    user = await crud_user.search(db=db, filters=filters, single_result=True)
-    if user:
+    try:
+        user, conflict = await crud_user.create_unique(db, obj_in=user_in)
+    except IntegrityError:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="The user with this email already exists in the system.",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An integrity error occurred.",
         )
-
-    try:
-        user = await crud_user.create(db, obj_in=user_in)
-    except IntegrityError as e:
-        if "UNIQUE constraint failed" in str(e.orig):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="The phone number already exists in the system.",
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="An integrity error occurred.",
-            )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred",
         )
 
+    if conflict == "email":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The user with this email already exists in the system.",
+        )
+    if conflict == "phoneNumber":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The phone number already exists in the system.",
+        )
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The user could not be created, please try again.",
+        )
+
     return user
     
 
+ME_CACHE_CONTROL = "private, no-cache"
+
+
 @router.get("/me", response_model=User)
-async def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(
+    request: Request, response: Response, current_user: User = Depends(get_current_user)
+):
+    # updatedAt changes on every write, so (id, updatedAt) identifies the
+    # representation and a poll with a matching ETag skips serialization
+    etag = weak_etag(current_user.id, current_user.updatedAt)
+    if etag_matches(request, etag):
+        return not_modified(etag, ME_CACHE_CONTROL)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = ME_CACHE_CONTROL
     return current_user
 
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(rate_limit("login"))])
 async def login(user_in: UserLogin, db: AsyncSession = Depends(get_db)):
     user = await crud_user.authenticate(db, email=user_in.email, password=user_in.password)
     if not user:
@@ -80,7 +98,7 @@ async def refresh_token(token: RefreshToken, db: AsyncSession = Depends(get_db))
     return {"access_token": access_token, "refresh_token": refresh_token}
 
 
-@router.post("/forget-password", response_model=dict)
+@router.post("/forget-password", response_model=dict, dependencies=[Depends(rate_limit("forget-password", bcrypt=False))])
 async def forget_password(request: ResetPasswordRequest, db: AsyncSession = Depends(get_db)):
     filters = {
         "email":(request.email, "=")
@@ -92,13 +110,14 @@ async def forget_password(request: ResetPasswordRequest, db: AsyncSession = Depe
             detail="User not found or inactive",
         )
 
-    reset_token = create_reset_token(user.email)
-    print(f"reset_token {reset_token}")
-    # send_reset_email(user.email, reset_token)
+    logger.info("Password reset requested for user {}", user.id)
+    # only the job row is written here, a job worker mints the token and
+    # sends the email
+    await queue_reset_email(db, user.email)
     return {"message": "Password reset email sent."}
 
 
-@router.post("/reset-password", response_model=dict)
+@router.post("/reset-password", response_model=dict, dependencies=[Depends(rate_limit("reset-password"))])
 async def reset_password(confirm: ResetPasswordConfirm, db: AsyncSession = Depends(get_db)):
     email = verify_reset_token(confirm.token)
     if not email:
@@ -117,7 +136,7 @@ async def reset_password(confirm: ResetPasswordConfirm, db: AsyncSession = Depen
         )
 
 
-    hashed_password = get_password_hash(confirm.new_password)
+    hashed_password = await password_hasher.hash(confirm.new_password)
 
     updated_user_password = UserPassword(
         passwordHash = hashed_password
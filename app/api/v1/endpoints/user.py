@@ -1,10 +1,151 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.crud.user import crud_user
-from app.schemas.user import User, UserUpdate, UserRole
+from app.db.session import sessionmanager
+from app.schemas.pagination import CursorPage
+from app.schemas.user import User, UserImportReport, UserUpdate, UserRole
+from app.services.user_import import UserImport, parse_csv, parse_ndjson
+from app.api.caching import CacheableRoute
 from app.api.deps import get_current_user, get_db
 
-router = APIRouter()
+router = APIRouter(route_class=CacheableRoute)
+
+
+def _search_filters(
+    username: Optional[str] = None, email: Optional[str] = None, is_active: Optional[bool] = None
+) -> dict:
+    filters = {}
+    if username is not None:
+        filters["username"] = (username, "contains")
+    if email is not None:
+        filters["email"] = (email, "iexact")
+    if is_active is not None:
+        filters["isActive"] = (is_active, "=")
+    return filters
+
+
+@router.get("/", response_model=CursorPage[User])
+async def list_users(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    order_by: str = Query("createdAt", description="Comma separated fields, prefix with - for descending"),
+    username: Optional[str] = Query(None, description="Case-insensitive substring of the username"),
+    email: Optional[str] = Query(None, description="Case-insensitive email address"),
+    total: Literal["estimate", "exact", "none"] = Query(
+        "estimate", description="Include the number of matching users, estimated on large tables"
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role != UserRole.SYSTEM_ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to list users",
+        )
+
+    filters = _search_filters(username=username, email=email)
+    try:
+        page = await crud_user.get_page(
+            db, limit=limit, cursor=cursor, order_by=order_by.split(","), filters=filters,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    response = {"items": page.items, "next_cursor": page.next_cursor, "prev_cursor": page.prev_cursor}
+    if total != "none":
+        count = await crud_user.count(db, filters, exact=total == "exact")
+        response.update(total=count.total, total_is_estimate=count.is_estimate)
+    return response
+
+
+EXPORT_BATCH_SIZE = 500
+
+
+async def _export_rows(format: str, filters: dict):
+    # The request's session is released once the handler returns, so the
+    # export runs on its own session for as long as the response streams.
+    fields = list(User.model_fields)
+    async with sessionmanager.session() as db:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        if format == "csv":
+            writer.writeheader()
+
+        rows = 0
+        async for user in crud_user.stream(db, filters=filters, order_by=["id"]):
+            item = User.model_validate(user)
+            if format == "csv":
+                writer.writerow(item.model_dump(mode="json"))
+            else:
+                buffer.write(item.model_dump_json())
+                buffer.write("\n")
+
+            rows += 1
+            if rows % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_users(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    username: Optional[str] = None,
+    email: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role != UserRole.SYSTEM_ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to export users",
+        )
+
+    filters = _search_filters(username=username, email=email, is_active=is_active)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(format, filters),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=users.{format}"},
+    )
+
+
+@router.post(
+    "/import",
+    response_model=UserImportReport,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_users(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Create users from an NDJSON or CSV body, reporting the rows that failed."""
+    if current_user.role != UserRole.SYSTEM_ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to import users",
+        )
+
+    parse = parse_csv if format == "csv" else parse_ndjson
+    return await UserImport(db).run(parse(request.stream()))
 
 
 @router.delete("/{user_id}", response_model=dict)
@@ -1,5 +1,5 @@
 import os
-from typing import Literal
+from typing import List, Literal, Optional
 
 from pydantic import PostgresDsn, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -16,23 +16,155 @@ class Settings(BaseSettings):
     ENVIRONMENT: Literal["development", "staging", "production"] = "development"
 
     LOG_LEVEL: Literal["DEBUG", "WARN", "INFO", "ERROR"] = "DEBUG"
+    # "json" writes one JSON object per line with the request and user ids
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    # variable values in tracebacks, defaults to off in production
+    LOG_DIAGNOSE: Optional[bool] = None
+    # comma separated sample rates per level and/or logger, e.g.
+    # "DEBUG=0.01,app.services.http=0.1,app.middleware.request_context:INFO=0.05"
+    LOG_SAMPLING: str = ""
+    # stdout records are written in batches by a background thread
+    LOG_BATCH_SIZE: int = 100
+    LOG_FLUSH_INTERVAL_SECONDS: float = 1.0
 
     PROJECT_NAME: str = "APP"
+
+    # Prometheus metrics at /metrics, see app.core.metrics
+    METRICS_ENABLED: bool = True
+
+    # event loop lag sampling and load shedding, see
+    # app.middleware.load_shedding; a threshold of 0 disables that check
+    LOOP_MONITOR_INTERVAL_MS: float = 100.0
+    LOAD_SHEDDING_ENABLED: bool = True
+    LOAD_SHEDDING_MAX_LAG_MS: float = 250.0
+    LOAD_SHEDDING_MAX_IN_FLIGHT: int = 0
+    # comma separated paths that are never shed
+    LOAD_SHEDDING_CRITICAL_PATHS: str = "/health,/metrics,/api/v1/auth/refresh"
+
+    # per-request profiling, see app.middleware.profiling
+    PROFILING_ENABLED: bool = False
+    PROFILING_SECRET: str = ""
+    PROFILING_TOKEN_TTL_SECONDS: int = 300
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_SECONDS: float = 0.001
+    PROFILING_OUTPUT_DIR: str = "profiles"
     API_V1_STR: str = "/api/v1"
 
     ACCESS_SECRET_KEY: str
     REFRESH_SECRET_KEY: str
     RESET_SECRET_KEY: str
+    # JWT "kid" of the current keys, plus comma separated "kid:secret" pairs
+    # of retired keys that keep verifying until their tokens expire
+    ACCESS_SECRET_KEY_ID: str = "access-1"
+    ACCESS_PREVIOUS_SECRET_KEYS: str = ""
+    REFRESH_SECRET_KEY_ID: str = "refresh-1"
+    REFRESH_PREVIOUS_SECRET_KEYS: str = ""
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     RESET_TOKEN_EXPIRE_MINUTES: int = 15
 
+    # bcrypt process pool of every web worker, defaults to the available
+    # cores divided by WEB_CONCURRENCY (set by gunicorn.conf.py)
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    WEB_CONCURRENCY: int = 1
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+
+    # token buckets in front of the bcrypt heavy auth routes, see
+    # app.services.rate_limit: sustained requests per second and burst size
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_IP_RATE: float = 1.0
+    RATE_LIMIT_IP_BURST: int = 10
+    RATE_LIMIT_EMAIL_RATE: float = 0.1
+    RATE_LIMIT_EMAIL_BURST: int = 5
+    RATE_LIMIT_ROUTE_RATE: float = 50.0
+    RATE_LIMIT_ROUTE_BURST: int = 100
+    RATE_LIMIT_MAX_KEYS: int = 100000
+
+    # per-worker cache of verified access token claims, kept until "exp"
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+
+    # per-worker cache of authenticated users, see app.crud.user.principal_cache
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+
     POSTGRES_SERVER: str
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     POSTGRES_PORT: int
+
+    # comma separated read replicas, "host" or "host:port", same credentials
+    # and database as the primary
+    POSTGRES_REPLICA_SERVERS: str = ""
+    DB_REPLICA_STRATEGY: Literal["round_robin", "least_connections"] = "round_robin"
+    DB_REPLICA_HEALTH_CHECK_SECONDS: int = 10
+
+    # one transaction per request: CRUD writes flush and get_db commits once
+    DB_UNIT_OF_WORK: bool = True
+
+    # coalesce concurrent CRUDBase.get calls on a session into one IN query,
+    # a window of 0 batches the calls made within the same event loop tick
+    DB_BATCH_GETS: bool = True
+    DB_BATCH_WINDOW_MS: float = 0.0
+    # distinct filter shapes kept by CRUDBase.search
+    SEARCH_STATEMENT_CACHE_SIZE: int = 256
+
+    # CRUDBase.count: planner estimates below the threshold are replaced by
+    # an exact COUNT(*), which is cached per filter shape and values
+    COUNT_ESTIMATE_THRESHOLD: int = 10000
+    COUNT_CACHE_TTL_SECONDS: int = 10
+    COUNT_CACHE_MAX_SIZE: int = 1024
+
+    # rows per statement for CRUDBase.create_many/update_many/delete_many
+    BULK_CHUNK_SIZE: int = 1000
+    # create_many(returning=False) switches to COPY from this many rows
+    BULK_COPY_THRESHOLD: int = 5000
+    # rows fetched per round trip by CRUDBase.stream
+    STREAM_YIELD_PER: int = 1000
+
+    # POST /users/import, see app.services.user_import: rows validated, hashed
+    # and inserted (and committed) per chunk, rows read per upload and row
+    # errors listed in the report
+    USER_IMPORT_CHUNK_SIZE: int = 500
+    USER_IMPORT_MAX_ROWS: int = 100000
+    USER_IMPORT_MAX_ERRORS: int = 1000
+
+    # background jobs, see app.services.jobs: worker coroutines per process,
+    # jobs claimed per round trip and retries with exponential backoff before
+    # a job is dead-lettered
+    JOBS_ENABLED: bool = True
+    JOB_WORKERS: int = 4
+    JOB_BATCH_SIZE: int = 10
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_TIMEOUT_SECONDS: float = 300.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BACKOFF_SECONDS: float = 10.0
+    JOB_RETRY_BACKOFF_MAX_SECONDS: float = 3600.0
+    JOB_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0
+
+    # outbound email, sent from background jobs by app.services.email
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 587
+    SMTP_USER: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_TLS: bool = True
+    SMTP_SSL: bool = False
+    SMTP_TIMEOUT_SECONDS: float = 10.0
+    EMAILS_FROM_EMAIL: str = "noreply@example.com"
+    EMAILS_FROM_NAME: str = ""
+    # "{token}" is replaced with the reset token
+    RESET_PASSWORD_URL: str = "http://localhost:3000/reset-password?token={token}"
+
+    # shared outbound client used by app.services.http.HTTPService
+    HTTP2_ENABLED: bool = True
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_TIMEOUT_SECONDS: float = 10.0
     
     @computed_field
     @property
@@ -46,4 +178,23 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
-settings = Settings()
\ No newline at end of file
+    @computed_field
+    @property
+    def SQLALCHEMY_REPLICA_URIS(self) -> List[str]:
+        uris = []
+        for server in filter(None, (s.strip() for s in self.POSTGRES_REPLICA_SERVERS.split(","))):
+            host, _, port = server.partition(":")
+            uris.append(
+                MultiHostUrl.build(
+                    scheme="postgresql+psycopg",
+                    username=self.POSTGRES_USER,
+                    password=self.POSTGRES_PASSWORD,
+                    host=host,
+                    port=int(port) if port else self.POSTGRES_PORT,
+                    path=self.POSTGRES_DB,
+                ).unicode_string()
+            )
+        return uris
+
+
+settings = Settings()
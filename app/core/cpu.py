@@ -0,0 +1,18 @@
+import os
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: its affinity mask, capped by a cgroup quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # containers: honour a cgroup v2 CPU quota ("max 100000" means none)
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(int(int(quota) / int(period)), 1))
+    except (OSError, ValueError):
+        pass
+    return cpus
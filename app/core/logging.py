@@ -1,33 +1,218 @@
+import atexit
+import json
+import os
+import random
 import sys
-from loguru import logger
+import threading
+import traceback
+from collections import deque
+from contextvars import ContextVar
 from pathlib import Path
+from typing import Any, Dict, Optional, TextIO
+
+from loguru import logger
 from app.core.config import settings
 
 
 LOG_DIR = Path(__file__).parent.parent / "logs"
 LOG_FILE = LOG_DIR / "app.log"
-LOG_DIR.mkdir(parents=True, exist_ok=True)
-
-logger.remove()
-
-log_level = settings.LOG_LEVEL.upper()
-
-logger.add(
-    sys.stdout,
-    format="{time:YYYY-MM-DD at HH:mm:ss} | {level} | {message}",
-    level=log_level,
-    backtrace=True,
-    diagnose=True,
-    enqueue=True
-)
-
-logger.add(
-    LOG_FILE,
-    level=log_level,
-    format="{time:YYYY-MM-DD at HH:mm:ss} | {level} | {message}",
-    rotation="20 MB",
-    retention="10 days",
-    compression="zip",
-    enqueue=True
-)
 
+TEXT_FORMAT = "{time:YYYY-MM-DD at HH:mm:ss} | {level} | {extra[request_id]} | {message}"
+
+# request id and user id of the request being handled, a mutable dict so
+# dependencies (e.g. get_current_user) can add to it after the middleware set it
+request_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_context", default=None)
+
+
+def bind_request_user(user_id: Any) -> None:
+    context = request_context.get()
+    if context is not None:
+        context["user_id"] = user_id
+
+
+def _add_request_context(record) -> None:
+    context = request_context.get()
+    extra = record["extra"]
+    extra.setdefault("request_id", context["request_id"] if context else "-")
+    extra.setdefault("user_id", context.get("user_id") if context else None)
+
+
+class Sampler:
+    """Keeps a fraction of the records per level and/or logger, see LOG_SAMPLING."""
+
+    def __init__(self, rules: str = ""):
+        self.levels: Dict[str, float] = {}
+        self.loggers: Dict[str, float] = {}
+        self.logger_levels: Dict[tuple, float] = {}
+        for rule in rules.split(","):
+            if not rule.strip():
+                continue
+            target, _, rate = rule.strip().rpartition("=")
+            name, _, level = target.partition(":")
+            if level:
+                self.logger_levels[(name, level.upper())] = float(rate)
+            elif name.upper() == name and "." not in name:
+                self.levels[name] = float(rate)
+            else:
+                self.loggers[name] = float(rate)
+
+    def rate(self, name: str, level: str) -> float:
+        if self.logger_levels or self.loggers:
+            module = name
+            while module:
+                if (module, level) in self.logger_levels:
+                    return self.logger_levels[(module, level)]
+                if module in self.loggers:
+                    return self.loggers[module]
+                module = module.rpartition(".")[0]
+        return self.levels.get(level, 1.0)
+
+    def __call__(self, record) -> bool:
+        rate = self.rate(record["name"] or "", record["level"].name)
+        return rate >= 1.0 or random.random() < rate
+
+
+def _json_format(record) -> str:
+    entry = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "message": record["message"],
+        "request_id": record["extra"].get("request_id"),
+        "user_id": record["extra"].get("user_id"),
+    }
+    fields = {key: value for key, value in record["extra"].items() if key not in ("request_id", "user_id", "json")}
+    if fields:
+        entry["extra"] = fields
+    if record["exception"] is not None:
+        entry["exception"] = "".join(traceback.format_exception(*record["exception"]))
+    # loguru formats the returned template, so the JSON goes through extra
+    record["extra"]["json"] = json.dumps(entry, default=str)
+    return "{extra[json]}\n"
+
+
+class BatchedSink:
+    """Writes formatted records to `stream` in batches from a background thread."""
+
+    def __init__(self, stream: Optional[TextIO] = None, batch_size: int = 100, flush_interval: float = 1.0):
+        self.stream = stream
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: deque = deque()
+        self._start()
+
+    def _start(self) -> None:
+        self._wakeup = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self._thread.start()
+
+    def after_fork(self) -> None:
+        # threads do not survive fork: the child gets a fresh writer and
+        # drops whatever the parent had not written yet
+        self._buffer.clear()
+        self._start()
+
+    def write(self, message: str) -> None:
+        self._buffer.append(message)
+        if len(self._buffer) >= self.batch_size:
+            with self._wakeup:
+                self._wakeup.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._wakeup:
+                if not self._closed and len(self._buffer) < self.batch_size:
+                    self._wakeup.wait(self.flush_interval)
+                closed = self._closed
+            self._drain()
+            if closed:
+                return
+
+    def _drain(self) -> None:
+        lines = []
+        while self._buffer:
+            lines.append(self._buffer.popleft())
+        if not lines:
+            return
+        stream = self.stream or sys.stdout
+        try:
+            stream.write("".join(lines))
+            stream.flush()
+        except Exception as e:
+            # never let a broken stream kill the thread, like loguru's catch=True
+            sys.__stderr__.write(f"--- Logging error, {len(lines)} records dropped: {e!r} ---\n")
+
+    def flush(self) -> None:
+        self._drain()
+
+    def close(self) -> None:
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join()
+
+
+_sink: Optional[BatchedSink] = None
+
+
+def configure_logging(stream: Optional[TextIO] = None, log_file: Optional[Path] = LOG_FILE) -> None:
+    """(Re)configure the loguru handlers from settings, once per worker process."""
+    global _sink
+
+    logger.remove()
+    if _sink is not None:
+        _sink.close()
+
+    log_level = settings.LOG_LEVEL.upper()
+    diagnose = settings.LOG_DIAGNOSE
+    if diagnose is None:
+        # diagnose prints local variables into tracebacks, secrets included
+        diagnose = settings.ENVIRONMENT != "production"
+    log_format = _json_format if settings.LOG_FORMAT == "json" else TEXT_FORMAT
+
+    logger.configure(patcher=_add_request_context)
+
+    _sink = BatchedSink(stream, settings.LOG_BATCH_SIZE, settings.LOG_FLUSH_INTERVAL_SECONDS)
+    logger.add(
+        _sink.write,
+        format=log_format,
+        level=log_level,
+        filter=Sampler(settings.LOG_SAMPLING),
+        backtrace=True,
+        diagnose=diagnose,
+    )
+
+    if log_file is not None:
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        logger.add(
+            log_file,
+            level=log_level,
+            format=log_format,
+            filter=Sampler(settings.LOG_SAMPLING),
+            rotation="20 MB",
+            retention="10 days",
+            compression="zip",
+            diagnose=diagnose,
+            enqueue=True
+        )
+
+
+def flush_logging() -> None:
+    """Write out every buffered record; call it before the process exits."""
+    if _sink is not None:
+        _sink.flush()
+
+
+def _close_sink() -> None:
+    if _sink is not None:
+        _sink.close()
+
+
+def _restart_sink() -> None:
+    if _sink is not None:
+        _sink.after_fork()
+
+
+atexit.register(_close_sink)
+os.register_at_fork(after_in_child=_restart_sink)
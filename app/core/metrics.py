@@ -0,0 +1,135 @@
+"""
+Prometheus metrics. With several workers set PROMETHEUS_MULTIPROC_DIR to an
+empty, writable directory so `/metrics` aggregates all of them.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+HTTP_REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being handled", multiprocess_mode="livesum"
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "Delay of the event loop in waking up a sleeping task",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOAD_SHED = Counter("http_requests_shed_total", "Requests rejected by load shedding", ["reason"])
+
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed", ["engine", "statement"])
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "SQL statement latency", ["engine", "statement"],
+    buckets=DB_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections checked out of the pool", ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections opened above pool_size", ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection", ["engine"],
+    buckets=DB_BUCKETS,
+)
+
+HTTP_CLIENT_LATENCY = Histogram(
+    "http_client_request_duration_seconds", "Outbound HTTP request latency",
+    ["method", "host", "status"], buckets=LATENCY_BUCKETS,
+)
+
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds", "Time bcrypt jobs wait for a pool worker",
+    buckets=LATENCY_BUCKETS,
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds", "Time spent inside bcrypt", buckets=LATENCY_BUCKETS,
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "bcrypt jobs rejected because the pool was saturated"
+)
+
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total", "Rate limiter and admission decisions",
+    ["scope", "route", "decision"],
+)
+
+TOKEN_CACHE_LOOKUPS = Counter(
+    "token_cache_lookups_total", "Verified access token cache lookups", ["result"]
+)
+
+JOBS_PROCESSED = Counter(
+    "jobs_processed_total", "Background jobs run, by outcome (done, retry, dead)", ["name", "outcome"]
+)
+JOB_DURATION = Histogram(
+    "job_duration_seconds", "Background job handler run time", ["name"], buckets=LATENCY_BUCKETS,
+)
+JOB_DELAY = Histogram(
+    "job_delay_seconds", "Time between a job becoming due and a worker claiming it",
+    buckets=LATENCY_BUCKETS,
+)
+
+_STATEMENT_TYPES = {"SELECT", "INSERT", "UPDATE", "DELETE", "COPY", "WITH", "BEGIN", "COMMIT", "ROLLBACK"}
+
+
+def _statement_type(statement: str) -> str:
+    keyword = statement.lstrip()[:8].split(None, 1)
+    keyword = keyword[0].upper() if keyword else ""
+    return keyword if keyword in _STATEMENT_TYPES else "OTHER"
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Record query count/latency and pool usage of `engine` under `name`."""
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is None:
+            return
+        statement_type = _statement_type(statement)
+        DB_QUERIES.labels(name, statement_type).inc()
+        DB_QUERY_LATENCY.labels(name, statement_type).observe(time.perf_counter() - started)
+
+    def _pool_usage(*args):
+        DB_POOL_CHECKED_OUT.labels(name).set(pool.checkedout())
+        DB_POOL_OVERFLOW.labels(name).set(max(pool.overflow(), 0))
+
+    event.listen(pool, "checkout", _pool_usage)
+    event.listen(pool, "checkin", _pool_usage)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,88 @@
+"""Helpers for the opt-in per-request profiler, see app.middleware.profiling."""
+import hashlib
+import hmac
+import json
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+PROFILE_HEADER = "x-profile"
+
+# SQL statements of the request being profiled, None when not profiling
+_captured_queries: ContextVar[Optional[List[dict]]] = ContextVar("captured_queries", default=None)
+
+
+def _signature(timestamp: str) -> str:
+    return hmac.new(
+        settings.PROFILING_SECRET.encode(), timestamp.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def make_profile_token(now: Optional[float] = None) -> str:
+    """Value for the X-Profile header, valid for PROFILING_TOKEN_TTL_SECONDS."""
+    timestamp = str(int(time.time() if now is None else now))
+    return f"{timestamp}.{_signature(timestamp)}"
+
+
+def verify_profile_token(token: str) -> bool:
+    if not settings.PROFILING_SECRET:
+        return False
+    timestamp, _, signature = token.partition(".")
+    if not timestamp.isdigit():
+        return False
+    if abs(time.time() - int(timestamp)) > settings.PROFILING_TOKEN_TTL_SECONDS:
+        return False
+    return hmac.compare_digest(signature, _signature(timestamp))
+
+
+def start_query_capture() -> List[dict]:
+    queries: List[dict] = []
+    _captured_queries.set(queries)
+    return queries
+
+
+def stop_query_capture() -> None:
+    _captured_queries.set(None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _captured_queries.get() is not None and context is not None:
+        context._profile_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _captured_queries.get()
+    started = getattr(context, "_profile_started", None)
+    if queries is None or started is None:
+        return
+    queries.append(
+        {
+            "statement": statement,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "executemany": executemany,
+        }
+    )
+
+
+def write_profile(name: str, speedscope: str, queries: List[dict], meta: dict) -> Path:
+    """
+    Write `<name>.speedscope.json` (open it at https://www.speedscope.app) and
+    `<name>.sql.json` with the request's statements and timings.
+    """
+    output_dir = Path(settings.PROFILING_OUTPUT_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    profile_path = output_dir / f"{name}.speedscope.json"
+    profile_path.write_text(speedscope)
+    (output_dir / f"{name}.sql.json").write_text(
+        json.dumps({**meta, "queries": queries}, indent=2)
+    )
+    return profile_path
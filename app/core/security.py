@@ -1,25 +1,136 @@
 from fastapi import HTTPException, status
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+import hashlib
+import time
+from typing import Any, Dict, Optional, Tuple
 import jwt
+from jwt.exceptions import InvalidTokenError
 from passlib.context import CryptContext
+from app.core import metrics
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.schemas.token import TokenPayload
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # openssl rand -hex 32 #to generate tokens
 ALGORITHM = "HS256"
 
+
+class KeyRing:
+    """Signing keys of one token type by JWT "kid"; previous keys keep verifying."""
+
+    def __init__(self, kid: str, secret: str, previous: Optional[Dict[str, str]] = None):
+        self.current_kid = kid
+        self._keys = {**(previous or {}), kid: secret}
+
+    def __contains__(self, kid: str) -> bool:
+        return kid in self._keys
+
+    def secret(self, kid: Optional[str]) -> str:
+        # tokens issued before key ids were introduced carry no kid
+        if kid is None:
+            return self._keys[self.current_kid]
+        try:
+            return self._keys[kid]
+        except KeyError:
+            raise InvalidTokenError(f"Unknown key id {kid}")
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        return jwt.encode(
+            payload, self._keys[self.current_kid], algorithm=ALGORITHM,
+            headers={"kid": self.current_kid},
+        )
+
+    def decode(self, token: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        kid = jwt.get_unverified_header(token).get("kid")
+        return kid, jwt.decode(token, self.secret(kid), algorithms=[ALGORITHM])
+
+    def add(self, kid: str, secret: str, current: bool = True):
+        self._keys[kid] = secret
+        if current:
+            self.current_kid = kid
+
+    def retire(self, kid: str):
+        if kid == self.current_kid:
+            raise ValueError("The current signing key cannot be retired.")
+        self._keys.pop(kid, None)
+
+
+def _parse_keys(value: str) -> Dict[str, str]:
+    keys = {}
+    for item in value.split(","):
+        if item.strip():
+            kid, _, secret = item.strip().partition(":")
+            keys[kid] = secret
+    return keys
+
+
+key_rings: Dict[str, KeyRing] = {
+    "access": KeyRing(
+        settings.ACCESS_SECRET_KEY_ID,
+        settings.ACCESS_SECRET_KEY,
+        _parse_keys(settings.ACCESS_PREVIOUS_SECRET_KEYS),
+    ),
+    "refresh": KeyRing(
+        settings.REFRESH_SECRET_KEY_ID,
+        settings.REFRESH_SECRET_KEY,
+        _parse_keys(settings.REFRESH_PREVIOUS_SECRET_KEYS),
+    ),
+}
+
+# Claims of verified access tokens keyed by the token's SHA-256 digest, each
+# entry lives until the token's own "exp". Values are (kid, TokenPayload).
+verified_token_cache = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    enabled=settings.TOKEN_CACHE_ENABLED,
+)
+
+
+def _flush_key(token_type: str, kid: str) -> int:
+    if token_type != "access":
+        return 0
+    return verified_token_cache.evict(lambda entry: entry[0] == kid)
+
+
+def rotate_key(token_type: str, kid: str, secret: str, retire_previous: bool = False):
+    """Make `kid` the signing key of `token_type`, optionally retiring the old keys."""
+    ring = key_rings[token_type]
+    previous = ring.current_kid
+    if kid in ring and ring.secret(kid) != secret:
+        _flush_key(token_type, kid)
+    ring.add(kid, secret)
+    if retire_previous and previous != kid:
+        retire_key(token_type, previous)
+
+
+def retire_key(token_type: str, kid: str):
+    key_rings[token_type].retire(kid)
+    _flush_key(token_type, kid)
+
+
+def decode_access_token(token: str) -> TokenPayload:
+    """Verify an access token and return its claims, cached until it expires."""
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = verified_token_cache.get(digest)
+    if cached is not None:
+        metrics.TOKEN_CACHE_LOOKUPS.labels("hit").inc()
+        return cached[1]
+    metrics.TOKEN_CACHE_LOOKUPS.labels("miss").inc()
+
+    kid, payload = key_rings["access"].decode(token)
+    token_data = TokenPayload(**payload)
+    if "exp" in payload:
+        ttl = payload["exp"] - time.time()
+        if ttl > 0:
+            verified_token_cache.set(digest, (kid, token_data), ttl=ttl)
+    return token_data
+
+
 def _create_token(sub: str | Any, expires_delta: timedelta, token_type: str) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
     to_encode: Dict[str, Any] = {"exp": expire, "sub": str(sub)}
-    
-    if token_type == "refresh":
-        secret_key = settings.REFRESH_SECRET_KEY
-    else:
-        secret_key = settings.ACCESS_SECRET_KEY
-
-    encoded_jwt = jwt.encode(to_encode, secret_key, algorithm=ALGORITHM)
-    return encoded_jwt
+    return key_rings["refresh" if token_type == "refresh" else "access"].encode(to_encode)
 
 def generate_tokens(sub: str | Any) -> str:
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -38,11 +149,7 @@ def get_password_hash(password: str) -> str:
 
 def validate_refresh_token(token: str) -> int:
     try:
-        payload = jwt.decode(
-            token,
-            settings.REFRESH_SECRET_KEY,
-            algorithms=[ALGORITHM],
-        )
+        _, payload = key_rings["refresh"].decode(token)
         
         user_id = int(payload.get("sub"))
         if user_id is None:
@@ -1,14 +1,42 @@
-from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
+import copy
+import json
+from typing import Any, AsyncIterator, Callable, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.db.base_class import Base
-from sqlalchemy import or_, and_, Column
+from sqlalchemy import or_, and_, Column, Integer, bindparam, column, delete, insert, inspect, literal, text, true, update, values
 from sqlalchemy.sql.expression import func
 from sqlalchemy.orm import InstrumentedAttribute,joinedload
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.logging import logger
+from app.crud.loader import ModelLoader, loader_for
+from app.crud.explain import Explain
+from app.crud.pagination import (
+    NEXT,
+    PREV,
+    Count,
+    KeysetPage,
+    decode_cursor,
+    encode_cursor,
+    keyset_clause,
+    order_clauses,
+    parse_order_by,
+)
+
+
+def _hashable(params: Dict[str, Any]) -> tuple:
+    return tuple(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in sorted(params.items())
+    )
+
+
+def _escape_like(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -32,14 +60,135 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self.model = model
         self._with_deleted = False
         self.use_logical_delete = use_logical_delete
+        self._column_keys: Optional[frozenset] = None
+        # search statements keyed by filter shape, shared with with_deleted() copies
+        self._statement_cache = TTLCache(max_size=settings.SEARCH_STATEMENT_CACHE_SIZE, ttl=float("inf"))
+        # exact counts keyed by filter shape and values
+        self._count_cache = TTLCache(max_size=settings.COUNT_CACHE_MAX_SIZE, ttl=settings.COUNT_CACHE_TTL_SECONDS)
+
+    def with_deleted(self) -> "CRUDBase[ModelType, CreateSchemaType, UpdateSchemaType]":
+        """
+        Return a copy of this CRUD object that also sees logically deleted
+        rows. The shared instance (e.g. `crud_user`) is left untouched.
+        """
+        # await crud_user.with_deleted().get(db, id=1)
+        scoped = copy.copy(self)
+        scoped._with_deleted = True
+        return scoped
+
+    def search_cache_info(self) -> Dict[str, int]:
+        return self._statement_cache.stats()
+
+    def _filter_shape(
+        self, filters: Dict[str, Tuple[Any, str]], combine_with: str = "and"
+    ) -> Tuple[tuple, Dict[str, Any]]:
+        """Split a filter dict into its shape and its bind values."""
+        shape = []
+        params: Dict[str, Any] = {}
+        for index, (field, (value, filter_type)) in enumerate(filters.items()):
+            if not isinstance(getattr(self.model, field, None), InstrumentedAttribute):
+                raise ValueError(f"Field {field} does not exist in the model.")
+
+            name = f"f{index}"
+            variant = None
+            if filter_type in ("like", "ilike"):
+                params[name] = f"%{value}%"
+            elif filter_type == "prefix":
+                params[name] = f"{_escape_like(value)}%"
+            elif filter_type == "contains":
+                params[name] = f"%{_escape_like(value)}%"
+                params[f"{name}_q"] = value
+            elif filter_type == "iexact":
+                params[name] = value
+            elif filter_type == "in":
+                if not isinstance(value, list):
+                    raise ValueError(f"Filter type 'in' requires a list of values.")
+                params[name] = value
+            elif filter_type in ("=", "!="):
+                # None compiles to IS [NOT] NULL, "= NULL" would match nothing
+                variant = value is None
+                if not variant:
+                    params[name] = value
+            elif filter_type in (">", "<"):
+                params[name] = value
+            elif filter_type == "is_null":
+                variant = bool(value)
+            else:
+                raise ValueError(f"Unsupported filter type {filter_type}")
+            shape.append((field, filter_type, variant))
+
+        return (tuple(shape), "or" if combine_with == "or" else "and"), params
+
+    def _filter_clause(self, shape: tuple):
+        fields, combine_with = shape
+        filter_clauses = []
+        for index, (field, filter_type, variant) in enumerate(fields):
+            column = getattr(self.model, field)
+            param = bindparam(f"f{index}", type_=column.type)
 
-    async def with_deleted(self):
-        """Allow fetching records even if they are marked as deleted."""
-        # session.query(User).with_deleted().get(1)
-        self._with_deleted = True
-        return self
+            if filter_type == "like":
+                filter_clauses.append(column.like(param))
+            elif filter_type == "ilike":
+                filter_clauses.append(column.ilike(param))
+            elif filter_type == "prefix":
+                # served by a btree index (varchar_pattern_ops on Postgres)
+                filter_clauses.append(column.like(param, escape="\\"))
+            elif filter_type == "contains":
+                # served by a pg_trgm GIN index on Postgres
+                filter_clauses.append(column.ilike(param, escape="\\"))
+            elif filter_type == "iexact":
+                # served by a functional index on lower(column)
+                filter_clauses.append(func.lower(column) == func.lower(param))
+            elif filter_type == "in":
+                filter_clauses.append(column.in_(bindparam(f"f{index}", expanding=True)))
+            elif filter_type == "=":
+                filter_clauses.append(column.is_(None) if variant else column == param)
+            elif filter_type == ">":
+                filter_clauses.append(column > param)
+            elif filter_type == "<":
+                filter_clauses.append(column < param)
+            elif filter_type == "!=":
+                filter_clauses.append(column.is_not(None) if variant else column != param)
+            elif filter_type == "is_null":
+                if variant:
+                    filter_clauses.append(column.is_(None))
+                else:
+                    filter_clauses.append(column.is_not(None))
+
+        if not filter_clauses:
+            return true()
+        if combine_with == "or":
+            return or_(*filter_clauses)
+        return and_(*filter_clauses)
+
+    def _similarity_order(self, shape: tuple) -> list:
+        """pg_trgm similarity of every "contains" filter, highest first."""
+        clauses = [
+            func.similarity(getattr(self.model, field), bindparam(f"f{index}_q")).desc()
+            for index, (field, filter_type, _) in enumerate(shape[0])
+            if filter_type == "contains"
+        ]
+        if clauses:
+            clauses.append(self.model.id)
+        return clauses
+
+    def _filtered_select(
+        self, filters: Optional[Dict[str, Tuple[Any, str]]], combine_with: str = "and"
+    ) -> Tuple[Any, Dict[str, Any]]:
+        query = select(self.model)
+        params: Dict[str, Any] = {}
+        if filters:
+            shape, params = self._filter_shape(filters, combine_with)
+            query = query.filter(self._filter_clause(shape))
+        if not self._with_deleted:
+            query = query.filter(self.model.isDeleted == False)
+        return query, params
 
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        if settings.DB_BATCH_GETS:
+            # concurrent gets on the same session become one WHERE id IN (...)
+            return await self._loader(db).load(id)
+
         query = select(self.model).filter(self.model.id == id)
 
         if not self._with_deleted:
@@ -47,15 +196,72 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         result = await db.execute(query)
         return result.scalars().first()
+
+    async def get_many(self, db: AsyncSession, ids: List[Any]) -> List[Optional[ModelType]]:
+        """Fetch several rows by id with one query, in the order of `ids`."""
+        return await self._loader(db).load_many(ids)
+
+    def _loader(self, db: AsyncSession) -> ModelLoader:
+        return loader_for(
+            self.model,
+            db,
+            with_deleted=self._with_deleted,
+            window=settings.DB_BATCH_WINDOW_MS / 1000,
+        )
     
     async def get_all(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: Optional[List[str]] = None,
     ) -> List[ModelType]:
+        query = select(self.model)
         if not self._with_deleted:
-            result = await db.execute(select(self.model).filter(self.model.isDeleted == False).offset(skip).limit(limit))
-        else:
-            result = await db.execute(select(self.model).offset(skip).limit(limit))
+            query = query.filter(self.model.isDeleted == False)
+        if order_by:
+            query = query.order_by(*order_clauses(self.model, parse_order_by(self.model, order_by)))
+        result = await db.execute(query.offset(skip).limit(limit))
         return result.scalars().all()
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order_by: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Tuple[Any, str]]] = None,
+        combine_with: str = "and",
+    ) -> KeysetPage[ModelType]:
+        """Keyset (cursor) pagination over `get_all`, or `search` when `filters` are given."""
+        keys = parse_order_by(self.model, order_by or ["createdAt"])
+        direction = NEXT
+        query, params = self._filtered_select(filters, combine_with)
+
+        if cursor:
+            values, direction = decode_cursor(cursor, keys)
+            query = query.filter(keyset_clause(self.model, keys, values, direction))
+
+        query = query.order_by(*order_clauses(self.model, keys, reverse=direction == PREV))
+        result = await db.execute(query.limit(limit + 1), params)
+        rows = list(result.scalars().all())
+
+        has_more = len(rows) > limit
+        items = rows[:limit]
+        if direction == PREV:
+            items.reverse()
+
+        page = KeysetPage(items=items)
+        if items:
+            # moving forward there is a previous page whenever we came from a
+            # cursor, moving backward there is always a next page
+            if (direction == NEXT and has_more) or direction == PREV:
+                page.next_cursor = encode_cursor(items[-1], keys, NEXT)
+            if (direction == PREV and has_more) or (direction == NEXT and cursor):
+                page.prev_cursor = encode_cursor(items[0], keys, PREV)
+        return page
     
     async def search(
         self, 
@@ -66,72 +272,158 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         single_result: bool = False,
         combine_with: str = "and",
         relations: List[ModelType] = [],
+        order_by: Optional[List[str]] = None,
     ) -> Union[ModelType, List[ModelType]]:
         # example 
         # filters = {
         #     "name": ("John", "ilike"),
         #     "age": (25, ">"),
         # }
+        # prefix, contains and iexact match literally (% and _ are escaped) and
+        # are the operators the username/email indexes can serve
         #await crud_model.search(db, filters=filters, single_result=True, combine_with="or", relations=[Organization.users])
-        query = select(self.model)
-        
-        filter_clauses = []
-        for field, (value, filter_type) in filters.items():
-            column = getattr(self.model, field, None)
+        # order_by takes field names, prefixed with "-" for descending: ["-createdAt", "id"]
+        shape, params = self._filter_shape(filters, combine_with)
+        # without an explicit order, "contains" matches come best match first
+        rank = not order_by and db.get_bind().dialect.name == "postgresql"
+        key = (
+            shape,
+            self._with_deleted,
+            tuple(str(relation) for relation in relations),
+            tuple(order_by or ()),
+            single_result,
+            rank,
+        )
 
-            if not isinstance(column, InstrumentedAttribute):
-                raise ValueError(f"Field {field} does not exist in the model.")
-            
-            if filter_type == "like":
-                filter_clauses.append(column.like(f"%{value}%"))
-            elif filter_type == "ilike":
-                filter_clauses.append(column.ilike(f"%{value}%"))
-            elif filter_type == "in":
-                if isinstance(value, list):
-                    filter_clauses.append(column.in_(value))
-                else:
-                    raise ValueError(f"Filter type 'in' requires a list of values.")
-            elif filter_type == "=":
-                filter_clauses.append(column == value)
-            elif filter_type == ">":
-                filter_clauses.append(column > value)
-            elif filter_type == "<":
-                filter_clauses.append(column < value)
-            elif filter_type == "!=":
-                filter_clauses.append(column != value)
-            elif filter_type == "is_null":
-                if value:
-                    filter_clauses.append(column.is_(None))
-                else:
-                    filter_clauses.append(column.is_not(None))
-            else:
-                raise ValueError(f"Unsupported filter type {filter_type}")
-        
-        if combine_with == "or":
-            query = query.filter(or_(*filter_clauses))
-        else:
-            query = query.filter(and_(*filter_clauses))
+        query = self._statement_cache.get(key)
+        if query is None:
+            query = select(self.model).filter(self._filter_clause(shape))
 
-        if not self._with_deleted:
-            query = query.filter(self.model.isDeleted == False)
-        
-        if relations:
-             query = query.options(*[joinedload(relation) for relation in relations])
+            if not self._with_deleted:
+                query = query.filter(self.model.isDeleted == False)
+
+            if relations:
+                 query = query.options(*[joinedload(relation) for relation in relations])
+
+            if order_by:
+                query = query.order_by(*order_clauses(self.model, parse_order_by(self.model, order_by)))
+            elif rank:
+                query = query.order_by(*self._similarity_order(shape))
+
+            if single_result:
+                query = query.limit(1)
+            else:
+                query = query.offset(bindparam("_offset", type_=Integer)).limit(bindparam("_limit", type_=Integer))
+            self._statement_cache.set(key, query)
 
         if single_result:
-            result = await db.execute(query.limit(1))
+            result = await db.execute(query, params)
             return result.scalars().first()
-        
-        query = query.offset(skip).limit(limit)
-        result = await db.execute(query)
+
+        result = await db.execute(query, {**params, "_offset": skip, "_limit": limit})
         return result.scalars().all()
     
-    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+    async def count(
+        self,
+        db: AsyncSession,
+        filters: Optional[Dict[str, Tuple[Any, str]]] = None,
+        *,
+        exact: bool = False,
+        combine_with: str = "and",
+    ) -> Count:
+        """Planner estimate of the rows matching `filters`, exact below COUNT_ESTIMATE_THRESHOLD."""
+        shape, params = self._filter_shape(filters or {}, combine_with)
+        if not exact and db.get_bind().dialect.name == "postgresql":
+            estimate = await self._estimate_count(db, shape, params)
+            if estimate is not None and estimate >= settings.COUNT_ESTIMATE_THRESHOLD:
+                return Count(total=estimate, is_estimate=True)
+
+        key = (shape, self._with_deleted, _hashable(params))
+        total = self._count_cache.get(key)
+        if total is None:
+            query = self._cached_statement(
+                ("count", shape, self._with_deleted),
+                lambda: self._where(select(func.count()).select_from(self.model), shape),
+            )
+            total = (await db.execute(query, params)).scalar_one()
+            self._count_cache.set(key, total)
+        return Count(total=total, is_estimate=False)
+
+    async def _estimate_count(self, db: AsyncSession, shape: tuple, params: Dict[str, Any]) -> Optional[int]:
+        if not shape[0] and self._with_deleted:
+            result = await db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+                {"table": self.model.__table__.name},
+            )
+            estimate = result.scalar()
+            # -1 until the table has been vacuumed or analyzed
+            return estimate if estimate is not None and estimate >= 0 else None
+
+        query = self._cached_statement(
+            ("estimate", shape, self._with_deleted),
+            lambda: Explain(self._where(select(literal(1)).select_from(self.model), shape)),
+        )
+        plan = (await db.execute(query, params)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def _where(self, query, shape: tuple):
+        query = query.where(self._filter_clause(shape))
+        if not self._with_deleted:
+            query = query.where(self.model.isDeleted == False)
+        return query
+
+    def _cached_statement(self, key: tuple, build: Callable[[], Any]):
+        query = self._statement_cache.get(key)
+        if query is None:
+            query = build()
+            self._statement_cache.set(key, query)
+        return query
+
+    async def stream(
+        self,
+        db: AsyncSession,
+        *,
+        filters: Optional[Dict[str, Tuple[Any, str]]] = None,
+        combine_with: str = "and",
+        order_by: Optional[List[str]] = None,
+        yield_per: Optional[int] = None,
+    ) -> AsyncIterator[ModelType]:
+        """Iterate over the matching rows in batches of `yield_per` from a server-side cursor."""
+        query, params = self._filtered_select(filters, combine_with)
+        if order_by:
+            query = query.order_by(*order_clauses(self.model, parse_order_by(self.model, order_by)))
+
+        query = query.execution_options(yield_per=yield_per or settings.STREAM_YIELD_PER)
+        result = await db.stream_scalars(query, params)
+        try:
+            async for obj in result:
+                yield obj
+        finally:
+            await result.close()
+
+    async def _commit(self, db: AsyncSession, commit: Optional[bool]) -> None:
+        """Commit, or only flush inside a unit of work (see `get_db`)."""
+        if commit is None:
+            commit = not db.info.get("unit_of_work", False)
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
+            db.info["has_writes"] = True
+
+    async def create(
+        self, db: AsyncSession, *, obj_in: CreateSchemaType, commit: Optional[bool] = None
+    ) -> ModelType:
+        # one INSERT ... RETURNING loads server defaults (id, createdAt, ...)
+        # without a refresh SELECT
         obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)  # type: ignore
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        result = await db.scalars(
+            insert(self.model).values(**self._column_values(obj_in_data)).returning(self.model)
+        )
+        db_obj = result.one()
+        await self._commit(db, commit)
         return db_obj
 
     async def update(
@@ -139,22 +431,298 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db: AsyncSession,
         *,
         db_obj: ModelType,
-        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        commit: Optional[bool] = None,
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
+        """Update the row of `db_obj`; raises ValueError for fields that are not columns."""
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+
+        values = self._column_values(update_data)
+        for field in update_data:
+            if field not in values:
+                raise ValueError(f"Field {field} does not exist in the model.")
+        if not values:
+            return db_obj
+
+        result = await db.scalars(
+            update(self.model)
+            .where(self.model.id == db_obj.id)
+            .values(**values)
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        db_obj = result.one()
+        await self._commit(db, commit)
         return db_obj
 
-    async def delete(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
+    async def create_unique(
+        self, db: AsyncSession, *, obj_in: CreateSchemaType, commit: Optional[bool] = None
+    ) -> Tuple[Optional[ModelType], Optional[str]]:
+        """Insert unless a unique value is taken: `(obj, None)` or `(None, field)`."""
+        data = self._column_values(jsonable_encoder(obj_in))
+        result = await db.scalars(
+            self._dialect_insert(db).values(**data).on_conflict_do_nothing().returning(self.model)
+        )
+        db_obj = result.first()
+        if db_obj is not None:
+            await self._commit(db, commit)
+            return db_obj, None
+
+        unique_columns = [
+            column for column in self.model.__table__.columns
+            if column.unique and column.key in data
+        ]
+        if not unique_columns:
+            return None, None
+        row = (
+            await db.execute(
+                select(*unique_columns)
+                .where(or_(*[column == data[column.key] for column in unique_columns]))
+                .limit(1)
+            )
+        ).first()
+        if row is None:
+            # the conflicting row was removed in the meantime
+            return None, None
+        for column, value in zip(unique_columns, row):
+            if value == data[column.key]:
+                return None, column.key
+        return None, None
+
+    async def create_many_unique(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: List[Union[CreateSchemaType, Dict[str, Any]]],
+        chunk_size: Optional[int] = None,
+        commit: Optional[bool] = None,
+    ) -> List[Optional[str]]:
+        """Bulk `create_unique`, returns `None` or the conflicting field for each row."""
+        chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+        rows = [self._column_values(obj if isinstance(obj, dict) else jsonable_encoder(obj)) for obj in objs_in]
+        unique_columns = [column for column in self.model.__table__.columns if column.unique]
+        if not unique_columns:
+            raise ValueError(f"{self.model.__name__} has no unique columns")
+        key = unique_columns[0]
+
+        conflicts: List[Optional[str]] = [None] * len(rows)
+        seen: Dict[str, set] = {column.key: set() for column in unique_columns}
+        pending = []
+        for index, row in enumerate(rows):
+            for column in unique_columns:
+                if row.get(column.key) in seen[column.key]:
+                    conflicts[index] = column.key
+                    break
+            else:
+                for column in unique_columns:
+                    seen[column.key].add(row.get(column.key))
+                pending.append(index)
+
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            inserted = set(
+                (
+                    await db.scalars(
+                        self._dialect_insert(db)
+                        .values([rows[index] for index in chunk])
+                        .on_conflict_do_nothing()
+                        .returning(key)
+                    )
+                ).all()
+            )
+            missing = [index for index in chunk if rows[index][key.key] not in inserted]
+            if not missing:
+                continue
+            taken = await self.taken_unique_values(db, [rows[index] for index in missing])
+            for index in missing:
+                conflicts[index] = next(
+                    (column.key for column in unique_columns if rows[index][column.key] in taken.get(column.key, ())),
+                    key.key,
+                )
+        await self._commit(db, commit)
+        return conflicts
+
+    async def taken_unique_values(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> Dict[str, set]:
+        """
+        The values of `rows` that rows in the table (logically deleted ones
+        included) already hold in a unique column, by column key.
+        """
+        unique_columns = [
+            column for column in self.model.__table__.columns
+            if column.unique and any(column.key in row for row in rows)
+        ]
+        if not rows or not unique_columns:
+            return {}
+        existing = (
+            await db.execute(
+                select(*unique_columns).where(
+                    or_(*[
+                        column.in_(list({row[column.key] for row in rows if column.key in row}))
+                        for column in unique_columns
+                    ])
+                )
+            )
+        ).all()
+        return {column.key: {row[i] for row in existing} for i, column in enumerate(unique_columns)}
+
+    def _dialect_insert(self, db: AsyncSession):
+        # INSERT with ON CONFLICT support
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            raise ValueError(f"ON CONFLICT inserts are not supported on the {dialect} dialect")
+        return dialect_insert(self.model)
+
+    def _column_values(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        columns = self._column_keys
+        if columns is None:
+            columns = self._column_keys = frozenset(attr.key for attr in inspect(self.model).column_attrs)
+        return {key: value for key, value in data.items() if key in columns}
+
+    async def create_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: List[Union[CreateSchemaType, Dict[str, Any]]],
+        chunk_size: Optional[int] = None,
+        returning: bool = True,
+        commit: Optional[bool] = None,
+    ) -> Union[List[ModelType], int]:
+        """Insert many rows in chunks; with `returning=False` return the number of rows."""
+        chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+        rows = [self._column_values(obj if isinstance(obj, dict) else jsonable_encoder(obj)) for obj in objs_in]
+        if not rows:
+            return [] if returning else 0
+
+        if not returning and len(rows) >= settings.BULK_COPY_THRESHOLD and self._supports_copy(db):
+            count = await self._copy_rows(db, rows)
+            await self._commit(db, commit)
+            return count
+
+        created: List[ModelType] = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            if returning:
+                result = await db.scalars(insert(self.model).returning(self.model), chunk)
+                created.extend(result.all())
+            else:
+                await db.execute(insert(self.model), chunk)
+        await self._commit(db, commit)
+        return created if returning else len(rows)
+
+    async def update_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: List[Dict[str, Any]],
+        chunk_size: Optional[int] = None,
+        commit: Optional[bool] = None,
+    ) -> int:
+        """Update many rows by primary key, each dict carries `id` plus the fields to change."""
+        chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+        table = self.model.__table__
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for obj in objs_in:
+            if "id" not in obj:
+                raise ValueError("update_many requires an id in every row.")
+            fields = tuple(sorted(key for key in obj if key != "id"))
+            for field in fields:
+                if field not in table.c:
+                    raise ValueError(f"Field {field} does not exist in the model.")
+            if fields:
+                groups.setdefault(fields, []).append(obj)
+
+        updated = 0
+        for fields, rows in groups.items():
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                if db.get_bind().dialect.name == "postgresql":
+                    data = values(
+                        *[column(name, table.c[name].type) for name in ("id", *fields)],
+                        name="data",
+                    ).data([tuple(row[name] for name in ("id", *fields)) for row in chunk])
+                    stmt = (
+                        update(table)
+                        .where(table.c.id == data.c.id)
+                        .values({name: data.c[name] for name in fields})
+                    )
+                    result = await db.execute(stmt)
+                    updated += result.rowcount
+                else:
+                    # executemany on the ORM bulk-update-by-primary-key path
+                    await db.execute(update(self.model), chunk)
+                    updated += len(chunk)
+        await self._commit(db, commit)
+        return updated
+
+    async def delete_many(
+        self,
+        db: AsyncSession,
+        *,
+        ids: List[int],
+        chunk_size: Optional[int] = None,
+        commit: Optional[bool] = None,
+    ) -> int:
+        """Delete many rows by id, honoring `use_logical_delete`."""
+        chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+        deleted = 0
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            if self.use_logical_delete:
+                stmt = (
+                    update(self.model)
+                    .where(self.model.id.in_(chunk), self.model.isDeleted == False)
+                    .values(isDeleted=True)
+                )
+            else:
+                stmt = delete(self.model).where(self.model.id.in_(chunk))
+            result = await db.execute(stmt.execution_options(synchronize_session=False))
+            deleted += result.rowcount
+        await self._commit(db, commit)
+        return deleted
+
+    def _supports_copy(self, db: AsyncSession) -> bool:
+        dialect = db.get_bind().dialect
+        return dialect.name == "postgresql" and dialect.driver == "psycopg"
+
+    def _copy_columns(self, rows: List[Dict[str, Any]]) -> List[Tuple[Any, Any]]:
+        # COPY bypasses SQLAlchemy, so python-side scalar defaults (isDeleted,
+        # isActive, ...) have to be filled in here; server defaults are left
+        # to Postgres by not listing their columns. A listed column missing
+        # from a row and without a default is NULL in it.
+        present = set().union(*rows)
+        columns = []
+        for col in self.model.__table__.columns:
+            default = col.default.arg if col.default is not None and col.default.is_scalar else None
+            if col.key in present or default is not None:
+                columns.append((col, default))
+        return columns
+
+    async def _copy_rows(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+        from psycopg import sql
+
+        columns = self._copy_columns(rows)
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(self.model.__table__.name),
+            sql.SQL(", ").join(sql.Identifier(col.name) for col, _ in columns),
+        )
+        async with raw_connection.driver_connection.cursor() as cursor:
+            async with cursor.copy(statement) as copy:
+                for row in rows:
+                    await copy.write_row([row.get(col.key, default) for col, default in columns])
+        return len(rows)
+
+    async def delete(
+        self, db: AsyncSession, *, id: int, commit: Optional[bool] = None
+    ) -> Optional[ModelType]:
         result = await db.execute(select(self.model).filter(self.model.id == id))
         obj = result.scalars().first()
 
@@ -169,5 +737,5 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         else:
             await db.delete(obj)
 
-        await db.commit()
+        await self._commit(db, commit)
         return obj
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, delete, insert, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.crud.base import CRUDBase
+from app.models.job import Job, JobStatus
+from app.schemas.job import JobCreate, JobUpdate
+
+
+class CRUDJob(CRUDBase[Job, JobCreate, JobUpdate]):
+    """
+    Queue operations on the jobs table. Timestamps are naive UTC from the
+    application clock, `runAt` included, so every comparison uses one clock.
+    """
+
+    async def create(self, db: AsyncSession, *, obj_in: JobCreate, commit: Optional[bool] = None) -> Job:
+        # the payload stays a dict and runAt a datetime, no JSON encoding
+        result = await db.scalars(
+            insert(Job).values(**obj_in.dict(), status=JobStatus.PENDING.value, attempts=0).returning(Job)
+        )
+        job = result.one()
+        await self._commit(db, commit)
+        return job
+
+    async def claim(self, db: AsyncSession, *, limit: int, now: datetime, stale_after: timedelta) -> List[Job]:
+        """Lock up to `limit` due or stale jobs with SKIP LOCKED and mark them running."""
+        due = (
+            select(Job.id)
+            .where(
+                or_(
+                    and_(Job.status == JobStatus.PENDING.value, Job.runAt <= now),
+                    and_(Job.status == JobStatus.RUNNING.value, Job.lockedAt < now - stale_after),
+                )
+            )
+            .order_by(Job.runAt)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.scalars(
+            update(Job)
+            .where(Job.id.in_(due.scalar_subquery()))
+            .values(status=JobStatus.RUNNING.value, attempts=Job.attempts + 1, lockedAt=now)
+            .returning(Job)
+            .execution_options(synchronize_session=False)
+        )
+        jobs = sorted(result.all(), key=lambda job: job.runAt)
+        await db.commit()
+        return jobs
+
+    async def complete(self, db: AsyncSession, *, id: int) -> None:
+        await db.execute(delete(Job).where(Job.id == id))
+        await db.commit()
+
+    async def retry(self, db: AsyncSession, *, id: int, run_at: datetime, error: str) -> None:
+        await self._finish(db, id, status=JobStatus.PENDING.value, runAt=run_at, lockedAt=None, lastError=error)
+
+    async def bury(self, db: AsyncSession, *, id: int, error: str) -> None:
+        """Move a job to the dead-letter state, where it stays for inspection."""
+        await self._finish(db, id, status=JobStatus.DEAD.value, lockedAt=None, lastError=error)
+
+    async def release(self, db: AsyncSession, *, ids: List[int]) -> None:
+        """Hand claimed jobs that never started back to the queue."""
+        if not ids:
+            return
+        await self._finish(
+            db, ids, status=JobStatus.PENDING.value, attempts=Job.attempts - 1, lockedAt=None
+        )
+
+    async def _finish(self, db: AsyncSession, ids, **values) -> None:
+        ids = ids if isinstance(ids, list) else [ids]
+        await db.execute(
+            update(Job)
+            .where(Job.id.in_(ids), Job.status == JobStatus.RUNNING.value)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+crud_job = CRUDJob(Job)
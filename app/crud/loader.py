@@ -0,0 +1,81 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+
+class ModelLoader:
+    """Batches the primary key lookups of one session into `WHERE id IN (...)` queries."""
+
+    def __init__(self, model: Any, db: AsyncSession, *, with_deleted: bool = False, window: float = 0.0):
+        self.model = model
+        self.db = db
+        self.with_deleted = with_deleted
+        self.window = window
+        self._futures: Dict[Any, asyncio.Future] = {}
+        self._queue: List[Any] = []
+        # strong references to the running batches, the loop keeps weak ones
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        self._key_type = model.id.type.python_type
+
+    async def load(self, id: Any) -> Optional[Any]:
+        try:
+            key = self._key_type(id)
+        except (TypeError, ValueError):
+            return None
+
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[key] = loop.create_future()
+            if not self._queue:
+                if self.window > 0:
+                    loop.call_later(self.window, self._dispatch)
+                else:
+                    loop.call_soon(self._dispatch)
+            self._queue.append(key)
+
+        # shield so one cancelled caller does not cancel the shared result
+        return await asyncio.shield(future)
+
+    async def load_many(self, ids: List[Any]) -> List[Optional[Any]]:
+        return list(await asyncio.gather(*[self.load(id) for id in ids]))
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        if keys:
+            task = asyncio.ensure_future(self._resolve(keys))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, keys: List[Any]) -> None:
+        try:
+            query = select(self.model).filter(self.model.id.in_(keys))
+            if not self.with_deleted:
+                query = query.filter(self.model.isDeleted == False)
+            async with self._lock:
+                result = await self.db.execute(query)
+                found = {obj.id: obj for obj in result.scalars().all()}
+        except Exception as exc:
+            for key in keys:
+                future = self._futures.pop(key)
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for key in keys:
+            future = self._futures.pop(key)
+            if not future.done():
+                future.set_result(found.get(key))
+
+
+def loader_for(model: Any, db: AsyncSession, *, with_deleted: bool = False, window: float = 0.0) -> ModelLoader:
+    """Return the loader of `model` bound to `db`, creating it on first use."""
+    loaders = db.info.setdefault("loaders", {})
+    key = (model, with_deleted)
+    loader = loaders.get(key)
+    if loader is None:
+        loader = loaders[key] = ModelLoader(model, db, with_deleted=with_deleted, window=window)
+    return loader
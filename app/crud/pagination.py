@@ -0,0 +1,122 @@
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import and_, literal, or_, tuple_
+from sqlalchemy.exc import ArgumentError
+from sqlalchemy.orm import InstrumentedAttribute
+
+T = TypeVar("T")
+
+NEXT = "next"
+PREV = "prev"
+
+
+@dataclass
+class KeysetPage(Generic[T]):
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+@dataclass
+class Count:
+    total: int
+    is_estimate: bool = False
+
+
+def parse_order_by(model: Any, order_by: Optional[Sequence[str]]) -> List[Tuple[str, bool]]:
+    """Turn `["-createdAt"]` into `[("createdAt", True), ("id", False)]`."""
+    keys: List[Tuple[str, bool]] = []
+    for item in order_by or []:
+        item = item.strip()
+        descending = item.startswith("-")
+        name = item.lstrip("+-")
+        if not isinstance(getattr(model, name, None), InstrumentedAttribute):
+            raise ValueError(f"Field {name} does not exist in the model.")
+        keys.append((name, descending))
+
+    if not any(name == "id" for name, _ in keys):
+        keys.append(("id", keys[-1][1] if keys else False))
+    return keys
+
+
+def order_clauses(model: Any, keys: List[Tuple[str, bool]], reverse: bool = False) -> list:
+    clauses = []
+    for name, descending in keys:
+        column = getattr(model, name)
+        clauses.append(column.asc() if descending == reverse else column.desc())
+    return clauses
+
+
+def keyset_clause(model: Any, keys: List[Tuple[str, bool]], values: Sequence[Any], direction: str):
+    """Rows strictly after (`next`) or before (`prev`) `values` in the sort order."""
+    columns = [getattr(model, name) for name, _ in keys]
+    # bound with the column types, a bare True/False cannot be compared with <
+    values = [literal(value, column.type) for column, value in zip(columns, values)]
+
+    def after(column, value, descending):
+        if descending == (direction == NEXT):
+            return column < value
+        return column > value
+
+    directions = {descending for _, descending in keys}
+    try:
+        if len(directions) == 1:
+            return after(tuple_(*columns), tuple_(*values), directions.pop())
+
+        clauses = []
+        for i, (column, value) in enumerate(zip(columns, values)):
+            equal = [columns[j] == values[j] for j in range(i)]
+            clauses.append(and_(*equal, after(column, value, keys[i][1])))
+        return or_(*clauses)
+    except ArgumentError:
+        raise ValueError(f"Cannot paginate by {_signature(keys)}.")
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+    return value
+
+
+def _signature(keys: List[Tuple[str, bool]]) -> str:
+    return ",".join(f"-{name}" if descending else name for name, descending in keys)
+
+
+def encode_cursor(obj: Any, keys: List[Tuple[str, bool]], direction: str) -> str:
+    payload = {
+        "o": _signature(keys),
+        "d": direction,
+        "v": [_encode_value(getattr(obj, name)) for name, _ in keys],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, keys: List[Tuple[str, bool]]) -> Tuple[List[Any], str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [_decode_value(value) for value in payload["v"]]
+        direction = payload["d"]
+        signature = payload["o"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor.")
+
+    if signature != _signature(keys) or direction not in (NEXT, PREV) or len(values) != len(keys):
+        raise ValueError("Cursor does not match the requested ordering.")
+    return values, direction
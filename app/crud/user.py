@@ -1,13 +1,61 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.core.security import verify_password, get_password_hash
+from sqlalchemy.orm import make_transient_to_detached
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserUpdate, UserCreateInDB
 from app.crud.base import CRUDBase
+from app.services.hashing import password_hasher
+
+
+# Column values of recently authenticated users keyed by id. Entries are
+# evicted on update/delete through crud_user; other workers see changes once
+# the TTL runs out.
+principal_cache = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    enabled=settings.PRINCIPAL_CACHE_ENABLED,
+)
+
+
+def _evict_principals(db: AsyncSession, ids: List[Any]) -> None:
+    """Evict `ids` from `principal_cache` now and again after the commit."""
+    ids = [id for id in ids if id is not None]
+    for id in ids:
+        principal_cache.delete(id)
+    pending = db.info.get("evicted_principals")
+    if pending is None:
+        pending = db.info["evicted_principals"] = set()
+        event.listen(db.sync_session, "after_commit", _evict_committed_principals, once=True)
+    pending.update(ids)
+
+
+def _evict_committed_principals(session) -> None:
+    for id in session.info.pop("evicted_principals", ()):
+        principal_cache.delete(id)
 
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
+    async def get_principal(self, db: AsyncSession, id: Any) -> Optional[User]:
+        """Same as `get` but served from `principal_cache` as a detached copy."""
+        data = principal_cache.get(id)
+        if data is not None:
+            user = User(**data)
+            make_transient_to_detached(user)
+            return user
+
+        user = await self.get(db, id=id)
+        if user is not None:
+            principal_cache.set(
+                id, {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+            )
+        return user
+
     async def authenticate(self, db: AsyncSession, *, email: str, password: str) -> User:
         filters = {
             "email":(email, "=")
@@ -15,18 +63,50 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         user = await crud_user.search(db=db, filters=filters, single_result=True)
         if not user:
             return None
-        if not verify_password(password, user.passwordHash):
+        if not await password_hasher.verify(password, user.passwordHash):
             return None
         return user
 
-    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+    async def create(self, db: AsyncSession, *, obj_in: UserCreate, commit: Optional[bool] = None) -> User:
+        user_in_db = await self._to_db(obj_in)
+        return await super().create(db=db, obj_in=user_in_db, commit=commit)
+
+    async def create_unique(
+        self, db: AsyncSession, *, obj_in: UserCreate, commit: Optional[bool] = None
+    ) -> Tuple[Optional[User], Optional[str]]:
+        """Check email and phone number before hashing the password."""
+        values = {"email": obj_in.email, "phoneNumber": obj_in.phoneNumber}
+        taken = await self.taken_unique_values(db, [values])
+        for field, value in values.items():
+            if value in taken.get(field, ()):
+                return None, field
+
+        user_in_db = await self._to_db(obj_in)
+        return await super().create_unique(db=db, obj_in=user_in_db, commit=commit)
+
+    async def _to_db(self, obj_in: UserCreate) -> UserCreateInDB:
         user_data = obj_in.dict(exclude={"password_confirm"})
-        hashed_password = get_password_hash(user_data.pop("password"))
-        user_in_db = UserCreateInDB(
+        hashed_password = await password_hasher.hash(user_data.pop("password"))
+        return UserCreateInDB(
             **user_data,
             passwordHash=hashed_password,
             role=UserRole.INDIVIDUAL_USER
         )
-        return await super().create(db=db, obj_in=user_in_db)
+
+    async def update(self, db: AsyncSession, *, db_obj: User, obj_in, commit: Optional[bool] = None) -> User:
+        _evict_principals(db, [db_obj.id])
+        return await super().update(db=db, db_obj=db_obj, obj_in=obj_in, commit=commit)
+
+    async def delete(self, db: AsyncSession, *, id: int, commit: Optional[bool] = None) -> Optional[User]:
+        _evict_principals(db, [id])
+        return await super().delete(db=db, id=id, commit=commit)
+
+    async def update_many(self, db: AsyncSession, *, objs_in: List[Dict[str, Any]], **kwargs) -> int:
+        _evict_principals(db, [obj.get("id") for obj in objs_in])
+        return await super().update_many(db=db, objs_in=objs_in, **kwargs)
+
+    async def delete_many(self, db: AsyncSession, *, ids: List[int], **kwargs) -> int:
+        _evict_principals(db, ids)
+        return await super().delete_many(db=db, ids=ids, **kwargs)
 
 crud_user = CRUDUser(User, use_logical_delete=True)
@@ -2,8 +2,13 @@ from typing import Any
 
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
 from sqlalchemy import TIMESTAMP, Column,Boolean
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
 
+# SQLite stores CURRENT_TIMESTAMP to the second; values bound with
+# microseconds would not compare equal to it (keyset cursors on createdAt)
+Timestamp = TIMESTAMP().with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite")
+
 
 @as_declarative()
 class Base:
@@ -12,8 +17,8 @@ class Base:
     # Generate __tablename__ automatically
 
     isDeleted = Column(Boolean, default=False, nullable=False, index=True)
-    createdAt = Column(TIMESTAMP, server_default=func.now(), nullable=False)
-    updatedAt = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
+    createdAt = Column(Timestamp, server_default=func.now(), nullable=False)
+    updatedAt = Column(Timestamp, server_default=func.now(), onupdate=func.now(), nullable=False)
 
     @declared_attr
     def __tablename__(cls) -> str:
@@ -1,42 +1,213 @@
+import asyncio
 import contextlib
-from typing import AsyncIterator
+import itertools
+import os
+import time
+from typing import AsyncIterator, List, Optional
 
+from sqlalchemy import TextClause, event, text
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
 from app.core.config import settings
+from app.core.logging import logger
+from app.core import metrics
+from app.crud.explain import Explain
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that reports how long checkouts wait for a connection."""
+
+    metrics_name = "primary"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_WAIT.labels(self.metrics_name).observe(time.perf_counter() - started)
+
+
+def _create_engine(url: str, name: str = "primary") -> AsyncEngine:
+    kwargs = {}
+    if settings.METRICS_ENABLED:
+        kwargs["poolclass"] = type("InstrumentedPool", (InstrumentedPool,), {"metrics_name": name})
+
+    engine = create_async_engine(
+        url,
+        pool_size=10,
+        max_overflow=20,
+        pool_timeout=30,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+        **kwargs,
+    )
+    if settings.METRICS_ENABLED:
+        metrics.instrument_engine(engine, name)
+    return engine
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.healthy = True
+
+        @event.listens_for(engine.sync_engine, "handle_error")
+        def _on_error(context):
+            if context.is_disconnect:
+                self.healthy = False
+
+
+class ReplicaRouter:
+    """Picks the primary for writes and a healthy replica for plain reads."""
+
+    def __init__(self, primary: AsyncEngine, replicas: List[AsyncEngine], strategy: str = "round_robin"):
+        self.primary = primary
+        self.replicas = [Replica(engine) for engine in replicas]
+        self.strategy = strategy
+        self._round_robin = itertools.cycle(self.replicas) if self.replicas else None
+
+    def choose_replica(self) -> Optional[AsyncEngine]:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        if self.strategy == "least_connections":
+            return min(healthy, key=lambda replica: replica.engine.pool.checkedout()).engine
+        for _ in range(len(self.replicas)):
+            replica = next(self._round_robin)
+            if replica.healthy:
+                return replica.engine
+        return None
+
+    async def check_health(self):
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+            except Exception as e:
+                if replica.healthy:
+                    logger.warning("Read replica {} is unhealthy: {}", replica.engine.url.host, e)
+                replica.healthy = False
+            else:
+                if not replica.healthy:
+                    logger.info("Read replica {} is healthy again", replica.engine.url.host)
+                replica.healthy = True
+
+
+class RoutingSession(Session):
+    """Sends reads to replicas until the session writes, then sticks to the primary."""
+
+    router: Optional[ReplicaRouter] = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        router = self.router
+        if router is None or not router.replicas:
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+        if self._flushing or _is_write(clause):
+            self.info["use_primary"] = True
+        if clause is None or self.info.get("use_primary") or not _is_plain_read(clause):
+            return router.primary.sync_engine
+
+        replica = router.choose_replica()
+        return (replica or router.primary).sync_engine
+
+
+def _is_plain_read(clause) -> bool:
+    if isinstance(clause, Select):
+        return clause._for_update_arg is None
+    if isinstance(clause, TextClause):
+        sql = clause.text.lstrip().upper()
+        return sql.startswith("SELECT") and "FOR UPDATE" not in sql and "FOR SHARE" not in sql
+    # a plain EXPLAIN plans the statement without running it
+    return isinstance(clause, Explain)
+
+
+def _is_write(clause) -> bool:
+    if isinstance(clause, UpdateBase):
+        return True
+    return isinstance(clause, TextClause) and not _is_plain_read(clause)
+
+
+def use_primary(db: AsyncSession) -> None:
+    """Send every remaining statement of this session to the primary."""
+    db.info["use_primary"] = True
+
 
 class DatabaseSessionManager:
+    """Owns the engines, created lazily once per worker process."""
+
     def __init__(self):
-        self._engine = create_async_engine(
-            settings.SQLALCHEMY_DATABASE_URI.unicode_string(),
-            pool_size=10,
-            max_overflow=20,
-            pool_timeout=30,
-            pool_recycle=1800,
-            pool_pre_ping=True,
+        self._engine: Optional[AsyncEngine] = None
+        self._router: Optional[ReplicaRouter] = None
+        self._sessionmaker: Optional[async_sessionmaker] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._pid: Optional[int] = None
+
+    def init(self):
+        if self._engine is not None and self._pid != os.getpid():
+            for engine in [self._engine, *(replica.engine for replica in self._router.replicas)]:
+                engine.sync_engine.dispose(close=False)
+            self._engine = None
+            self._health_task = None
+        if self._engine is not None:
+            return
+
+        self._engine = _create_engine(settings.SQLALCHEMY_DATABASE_URI.unicode_string())
+        self._router = ReplicaRouter(
+            self._engine,
+            [
+                _create_engine(url, f"replica{index}")
+                for index, url in enumerate(settings.SQLALCHEMY_REPLICA_URIS)
+            ],
+            strategy=settings.DB_REPLICA_STRATEGY,
         )
         self._sessionmaker = async_sessionmaker(
-            autocommit=False, 
-            bind=self._engine, 
-            expire_on_commit=False
+            autocommit=False,
+            bind=self._engine,
+            expire_on_commit=False,
+            sync_session_class=type("RoutingSession", (RoutingSession,), {"router": self._router}),
         )
+        self._pid = os.getpid()
+
+    def start_health_checks(self):
+        if self._router is None or not self._router.replicas or self._health_task is not None:
+            return
+
+        async def _run():
+            while True:
+                await self._router.check_health()
+                await asyncio.sleep(settings.DB_REPLICA_HEALTH_CHECK_SECONDS)
+
+        self._health_task = asyncio.create_task(_run())
 
     async def close(self):
         if self._engine is None:
             raise Exception("DatabaseSessionManager is not initialized")
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for replica in self._router.replicas:
+            await replica.engine.dispose()
         await self._engine.dispose()
 
         self._engine = None
+        self._router = None
         self._sessionmaker = None
+        self._pid = None
 
     @contextlib.asynccontextmanager
     async def connect(self) -> AsyncIterator[AsyncConnection]:
-        if self._engine is None:
-            raise Exception("DatabaseSessionManager is not initialized")
+        if self._pid != os.getpid():
+            self.init()
 
         async with self._engine.begin() as connection:
             try:
@@ -47,8 +218,8 @@ class DatabaseSessionManager:
 
     @contextlib.asynccontextmanager
     async def session(self) -> AsyncIterator[AsyncSession]:
-        if self._sessionmaker is None:
-            raise Exception("DatabaseSessionManager is not initialized")
+        if self._pid != os.getpid():
+            self.init()
 
         session = self._sessionmaker()
         try:
@@ -64,5 +235,9 @@ sessionmanager = DatabaseSessionManager()
 
 
 async def get_db():
+    """Request-scoped session, committed once at the end with DB_UNIT_OF_WORK."""
     async with sessionmanager.session() as session:
+        session.info["unit_of_work"] = settings.DB_UNIT_OF_WORK
         yield session
+        if session.info.get("has_writes"):
+            await session.commit()
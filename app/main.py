@@ -1,26 +1,47 @@
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.v1.api import api_router
 from app.core.config import settings
-from app.core.logging import logger
+from app.core.logging import configure_logging, flush_logging, logger
+from app.core.metrics import render_metrics
 from app.db.session import sessionmanager
+from app.middleware import LoadSheddingMiddleware, MetricsMiddleware, ProfilingMiddleware, RequestContextMiddleware
+from app.services.hashing import password_hasher
+from app.services.http import HTTPService
+from app.services.jobs import job_queue
+from app.services.loop_monitor import loop_monitor
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup actions (if any)
+    # Startup actions, run once in every worker process: nothing that holds
+    # threads, sockets or pools is created at import time
+    configure_logging()
+    sessionmanager.init()
+    password_hasher.start()
+    HTTPService.start()
+    sessionmanager.start_health_checks()
+    loop_monitor.start()
+    if settings.JOBS_ENABLED:
+        job_queue.start()
     logger.info("Server started!")
     yield
     # Shutdown actions
     logger.info("Server shutdown!")
 
+    await job_queue.close()
+    await loop_monitor.close()
+    await password_hasher.close()
+    await HTTPService.close()
+
     if sessionmanager._engine is not None:
         # Close the DB connection
         await sessionmanager.close()
+    flush_logging()
 
 app = FastAPI(
     title=settings.PROJECT_NAME, 
@@ -36,6 +57,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+if settings.LOAD_SHEDDING_ENABLED:
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        monitor=loop_monitor,
+        max_lag=settings.LOAD_SHEDDING_MAX_LAG_MS / 1000,
+        max_in_flight=settings.LOAD_SHEDDING_MAX_IN_FLIGHT,
+        critical_paths=[path.strip() for path in settings.LOAD_SHEDDING_CRITICAL_PATHS.split(",") if path.strip()],
+    )
+
+app.add_middleware(RequestContextMiddleware)
+
+# added last so it is the outermost middleware and also counts shed requests
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     # Handle general exceptions
@@ -50,6 +89,7 @@ async def http_exception_handler(request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"message": exc.detail},
+        headers=exc.headers,
     )
 
 health_router = APIRouter()
@@ -62,5 +102,13 @@ async def health_check():
     """
     return {"status": "ok"}
 
+
+if settings.METRICS_ENABLED:
+    @health_router.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics in the text exposition format."""
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
 app.include_router(health_router)
 app.include_router(api_router, prefix=settings.API_V1_STR)
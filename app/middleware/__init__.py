@@ -0,0 +1,4 @@
+from .load_shedding import LoadSheddingMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .request_context import RequestContextMiddleware
@@ -0,0 +1,61 @@
+import json
+from typing import Iterable, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import metrics
+from app.services.loop_monitor import LoopMonitor
+
+_BODY = json.dumps({"message": "Server is overloaded, please try again later."}).encode()
+
+
+class LoadSheddingMiddleware:
+    """Answers 503 before routing while the event loop lags or too many requests run."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        monitor: LoopMonitor,
+        max_lag: float = 0.2,
+        max_in_flight: int = 0,
+        critical_paths: Iterable[str] = (),
+    ):
+        self.app = app
+        self.monitor = monitor
+        self.max_lag = max_lag
+        self.max_in_flight = max_in_flight
+        self.critical_paths = frozenset(critical_paths)
+
+    def _overloaded(self) -> Optional[str]:
+        if self.max_lag and self.monitor.lag > self.max_lag:
+            return "lag"
+        if self.max_in_flight and self.monitor.in_flight >= self.max_in_flight:
+            return "concurrency"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["path"] not in self.critical_paths:
+            reason = self._overloaded()
+            if reason is not None:
+                metrics.LOAD_SHED.labels(reason).inc()
+                await send({
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(_BODY)).encode()),
+                        (b"retry-after", b"1"),
+                    ],
+                })
+                await send({"type": "http.response.body", "body": _BODY})
+                return
+
+        self.monitor.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.in_flight -= 1
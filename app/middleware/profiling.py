@@ -0,0 +1,74 @@
+import asyncio
+import random
+import time
+import uuid
+
+from pyinstrument import Profiler
+from pyinstrument.renderers import SpeedscopeRenderer
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.profiling import (
+    PROFILE_HEADER,
+    start_query_capture,
+    stop_query_capture,
+    verify_profile_token,
+    write_profile,
+)
+
+
+class ProfilingMiddleware:
+    """Profiles requests sent with a signed `X-Profile` header or sampled by rate."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _should_profile(self, scope: Scope) -> bool:
+        for key, value in scope["headers"]:
+            if key == PROFILE_HEADER.encode():
+                return verify_profile_token(value.decode("latin-1"))
+        rate = settings.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = Profiler(interval=settings.PROFILING_INTERVAL_SECONDS, async_mode="enabled")
+        queries = start_query_capture()
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            stop_query_capture()
+            meta = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{profile_id}"
+            try:
+                # rendering and writing can take a while on big profiles
+                await asyncio.to_thread(
+                    lambda: write_profile(name, profiler.output(SpeedscopeRenderer()), queries, meta)
+                )
+            except Exception as e:
+                logger.error("Could not write profile {}: {}", profile_id, e)
+            else:
+                logger.info("Profiled {} {} as {}", scope["method"], scope["path"], name)
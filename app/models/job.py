@@ -0,0 +1,29 @@
+from enum import Enum
+
+from sqlalchemy import JSON, TIMESTAMP, Column, Index, Integer, String, Text, func
+from app.db.base import Base
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DEAD = "dead"
+
+class Job(Base):
+    """Deferred work run by app.services.jobs."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String, nullable=False, default=JobStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    maxAttempts = Column(Integer, nullable=False)
+    runAt = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    lockedAt = Column(TIMESTAMP, nullable=True)
+    lastError = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # the claim query: due pending jobs in runAt order, and stale running
+        # jobs of crashed workers
+        Index("ix_jobs_status_runAt", "status", "runAt"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Index, Integer, String, Boolean, func
 from app.db.base import Base
 from enum import Enum
 
@@ -17,3 +17,15 @@ class User(Base):
     role = Column(Integer, default=UserRole.INDIVIDUAL_USER, nullable=False, index=True)
     isActive = Column(Boolean, default=True, nullable=False, index=True)
 
+    __table_args__ = (
+        # backs keyset pagination on the default (createdAt, id) sort key
+        Index("ix_users_createdAt_id", "createdAt", "id"),
+        # CRUDBase.search operators: "contains" (pg_trgm), "prefix" and "iexact"
+        Index(
+            "ix_users_username_trgm", "username",
+            postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"},
+        ),
+        Index("ix_users_username_pattern", "username", postgresql_ops={"username": "varchar_pattern_ops"}),
+        Index("ix_users_email_lower", func.lower(email)),
+    )
+
@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+
+class JobCreate(BaseModel):
+    name: str
+    payload: Dict[str, Any] = {}
+    maxAttempts: int
+    runAt: datetime
+
+class JobUpdate(BaseModel):
+    status: Optional[str] = None
+    runAt: Optional[datetime] = None
+    lastError: Optional[str] = None
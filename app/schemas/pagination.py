@@ -0,0 +1,14 @@
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    # absent unless requested, an estimate when total_is_estimate is set
+    total: Optional[int] = None
+    total_is_estimate: bool = False
@@ -1,6 +1,6 @@
 from app.models.user import UserRole
 from pydantic import BaseModel, EmailStr, constr, validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -23,8 +23,9 @@ class UserLogin(UserBase):
 class UserCreate(UserBase):
     username: constr(min_length=3, max_length=50) # type: ignore
     phoneNumber: str
-    password: constr(min_length=8) # type: ignore
-    password_confirm: constr(min_length=8) # type: ignore
+    # passlib refuses to hash anything longer
+    password: constr(min_length=8, max_length=4096) # type: ignore
+    password_confirm: constr(min_length=8, max_length=4096) # type: ignore
 
     @validator('password_confirm')
     def passwords_match(cls, v, values, **kwargs):
@@ -64,3 +65,22 @@ class User(UserBase):
 
     class Config:
         from_attributes = True
+
+
+class UserImportError(BaseModel):
+    # 1-based data row, the CSV header is not counted
+    row: int
+    field: Optional[str] = None
+    message: str
+
+class UserImportReport(BaseModel):
+    rows: int
+    created: int
+    failed: int
+    errors: List[UserImportError]
+    # errors past USER_IMPORT_MAX_ERRORS were left out, failed still counts them
+    errors_truncated: bool = False
+    seconds: float
+    rows_per_second: float
+    hash_seconds: float
+    insert_seconds: float
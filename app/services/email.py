@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any, Dict
+
+import emails
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.security import create_reset_token
+from app.services.jobs import job_queue
+
+
+class EmailDeliveryError(Exception):
+    pass
+
+
+def _send(to: str, subject: str, html: str) -> None:
+    message = emails.html(
+        html=html,
+        subject=subject,
+        mail_from=(settings.EMAILS_FROM_NAME or settings.PROJECT_NAME, settings.EMAILS_FROM_EMAIL),
+    )
+    smtp = {
+        "host": settings.SMTP_HOST,
+        "port": settings.SMTP_PORT,
+        "timeout": settings.SMTP_TIMEOUT_SECONDS,
+    }
+    if settings.SMTP_SSL:
+        smtp["ssl"] = True
+    elif settings.SMTP_TLS:
+        smtp["tls"] = True
+    if settings.SMTP_USER:
+        smtp["user"] = settings.SMTP_USER
+        smtp["password"] = settings.SMTP_PASSWORD
+    response = message.send(to=to, smtp=smtp)
+    if response is None or response.status_code != 250:
+        error = getattr(response, "error", None) or getattr(response, "status_text", None)
+        raise EmailDeliveryError(f"SMTP delivery to {to} failed: {error}")
+
+
+async def send_email(to: str, subject: str, html: str) -> None:
+    """Send one email over SMTP; raises EmailDeliveryError when refused."""
+    await asyncio.to_thread(_send, to, subject, html)
+
+
+@job_queue.handler("send_reset_email")
+async def send_reset_email(payload: Dict[str, Any]) -> None:
+    # minted here rather than stored in the job row, where it would sit in
+    # plaintext (and stay there for dead-lettered jobs); a retried job also
+    # gets a token with its full lifetime
+    token = create_reset_token(payload["email"])
+    if settings.ENVIRONMENT == "development":
+        # logged for local testing without an SMTP server
+        logger.debug("Reset token for {}: {}", payload["email"], token)
+    link = settings.RESET_PASSWORD_URL.format(token=token)
+    await send_email(
+        payload["email"],
+        f"{settings.PROJECT_NAME} - Password reset",
+        f'<p>A password reset was requested for your account.</p>'
+        f'<p><a href="{link}">Reset your password</a>. '
+        f'The link expires in {settings.RESET_TOKEN_EXPIRE_MINUTES} minutes.</p>'
+        f'<p>If you did not ask for this, ignore this email.</p>',
+    )
+    logger.info("Password reset email sent")
+
+
+async def queue_reset_email(db: AsyncSession, email: str) -> None:
+    """Enqueue the reset email in the request's transaction; it is sent by a job worker."""
+    await job_queue.enqueue(db, "send_reset_email", {"email": email})
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.cpu import available_cpus
+from app.core.logging import logger
+from app.core.security import get_password_hash, verify_password
+
+
+def _timed_call(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float, float]:
+    # Runs inside the worker process. Wall clock timestamps are used so the
+    # parent can split the total latency into queue wait and hashing time.
+    started_at = time.time()
+    result = fn(*args)
+    return result, started_at, time.time()
+
+
+def _hash_all(passwords: List[str]) -> List[str]:
+    return [get_password_hash(password) for password in passwords]
+
+
+def default_pool_size() -> int:
+    # every web worker on the host has its own pool, they share the cores
+    return max(available_cpus() // max(settings.WEB_CONCURRENCY, 1), 1)
+
+
+class PasswordHasher:
+    """Runs bcrypt in a bounded process pool; a full queue fails fast with a 503."""
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: int = 64):
+        self.max_workers = max_workers or default_pool_size()
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._stats: Dict[str, float] = {
+            "jobs": 0,
+            "rejected": 0,
+            "queue_wait_seconds": 0.0,
+            "hash_seconds": 0.0,
+        }
+
+    def start(self):
+        if self._executor is not None:
+            return
+        # spawn keeps the children free of the parent's loop, threads and sockets
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=get_context("spawn")
+        )
+        logger.info("Password hasher started with {} workers", self.max_workers)
+
+    async def close(self):
+        if self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        await asyncio.get_running_loop().run_in_executor(
+            None, lambda: executor.shutdown(wait=True, cancel_futures=True)
+        )
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def stats(self) -> Dict[str, float]:
+        return {**self._stats, "pending": self._pending}
+
+    def admit(self):
+        """Fail fast with a 503 when the queue is full."""
+        if self._pending >= self.max_queue:
+            self._stats["rejected"] += 1
+            metrics.PASSWORD_HASH_REJECTED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again later.",
+                headers={"Retry-After": "1"},
+            )
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self.admit()
+        return await self._submit(fn, *args)
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self._pending += 1
+        submitted_at = time.time()
+        try:
+            # Without a pool (scripts, tests) fall back to the default thread
+            # executor, which still keeps the event loop responsive.
+            result, started_at, finished_at = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _timed_call, fn, *args
+            )
+        finally:
+            self._pending -= 1
+
+        queue_wait = max(started_at - submitted_at, 0.0)
+        self._stats["jobs"] += 1
+        self._stats["queue_wait_seconds"] += queue_wait
+        self._stats["hash_seconds"] += finished_at - started_at
+        metrics.PASSWORD_HASH_QUEUE_WAIT.observe(queue_wait)
+        metrics.PASSWORD_HASH_DURATION.observe(finished_at - started_at)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def hash_many(self, passwords: List[str], batch_size: int = 8) -> List[str]:
+        """Hash a bulk load of passwords across the pool, `batch_size` per job."""
+        limit = asyncio.Semaphore(self.max_workers)
+
+        async def run(batch: List[str]) -> List[str]:
+            async with limit:
+                return await self._submit(_hash_all, batch)
+
+        batches = await asyncio.gather(
+            *(run(passwords[start:start + batch_size]) for start in range(0, len(passwords), batch_size))
+        )
+        return [hashed for batch in batches for hashed in batch]
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
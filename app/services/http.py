@@ -1,37 +1,103 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
 import httpx
+from app.core import metrics
+from app.core.config import settings
 from app.core.logging import logger
 
 
 async def log_request(request):
-    logger.info(
-        f"Request event hook: {request.method} {request.url} - Waiting for response"
-    )
+    logger.debug("Outbound request {} {}", request.method, request.url)
 
 
 async def log_response(response):
     request = response.request
-    logger.info(
-        f"Response event hook: {request.method} {request.url} - Status {response.status_code}"
-    )
+    logger.info("Outbound response {} {} - Status {}", request.method, request.url, response.status_code)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
 
 
 class HTTPService:
-    @staticmethod
-    async def request(method: str, url: str, headers: dict = None, data: dict = None):
-        client = httpx.AsyncClient(
-            headers=headers,
+    """Outbound HTTP calls over one long-lived client per worker."""
+
+    _client: Optional[httpx.AsyncClient] = None
+    _host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    @classmethod
+    def start(cls) -> httpx.AsyncClient:
+        if cls._client is not None:
+            return cls._client
+
+        http2 = settings.HTTP2_ENABLED
+        if http2 and not _http2_available():
+            logger.warning("HTTP2_ENABLED is set but the h2 package is missing, using HTTP/1.1")
+            http2 = False
+
+        cls._client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=settings.HTTP_TIMEOUT_SECONDS,
             event_hooks={"request": [log_request], "response": [log_response]},
         )
+        return cls._client
+
+    @classmethod
+    async def close(cls):
+        if cls._client is None:
+            return
+        client, cls._client = cls._client, None
+        cls._host_limits = {}
+        await client.aclose()
+
+    @classmethod
+    def _host_limit(cls, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        limit = cls._host_limits.get(host)
+        if limit is None:
+            limit = cls._host_limits[host] = asyncio.Semaphore(
+                settings.HTTP_MAX_CONNECTIONS_PER_HOST
+            )
+        return limit
+
+    @classmethod
+    async def request(
+        cls,
+        method: str,
+        url: str,
+        headers: dict = None,
+        data: dict = None,
+        timeout: Optional[float] = None,
+    ):
+        client = cls.start()
+        request_timeout = httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
 
+        started = time.perf_counter()
+        status_label = "error"
         try:
-            response = await client.request(method, url, json=data)
+            async with cls._host_limit(url):
+                response = await client.request(
+                    method, url, headers=headers, json=data, timeout=request_timeout
+                )
+            status_label = str(response.status_code)
             response.raise_for_status()
             return response
         except httpx.HTTPStatusError as exc:
-            logger.error(
-                f"HTTP error occurred: {exc.response.status_code} - {exc.response.text}"
-            )
+            logger.error("HTTP error occurred: {} - {}", exc.response.status_code, exc.response.text)
 
             return None
         finally:
-            await client.aclose()
\ No newline at end of file
+            metrics.HTTP_CLIENT_LATENCY.labels(
+                method.upper(), httpx.URL(url).host, status_label
+            ).observe(time.perf_counter() - started)
@@ -0,0 +1,225 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import logger
+from app.crud.job import crud_job
+from app.db.session import sessionmanager
+from app.models.job import Job
+from app.schemas.job import JobCreate
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class JobQueue:
+    """Durable background jobs, enqueued in the request's transaction and run with retries."""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        batch_size: int = 10,
+        poll_interval: float = 1.0,
+        timeout: float = 300.0,
+        max_attempts: int = 5,
+        backoff: float = 10.0,
+        max_backoff: float = 3600.0,
+        shutdown_timeout: float = 10.0,
+        session_factory: Optional[Callable[[], Any]] = None,
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.shutdown_timeout = shutdown_timeout
+        self.handlers: Dict[str, JobHandler] = {}
+        self._session_factory = session_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._tasks: List[asyncio.Task] = []
+        self._busy = 0
+
+    def handler(self, name: str) -> Callable[[JobHandler], JobHandler]:
+        """Register the coroutine function that runs jobs called `name`."""
+
+        def register(fn: JobHandler) -> JobHandler:
+            self.handlers[name] = fn
+            return fn
+
+        return register
+
+    def session(self):
+        return (self._session_factory or sessionmanager.session)()
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        name: str,
+        payload: Optional[Dict[str, Any]] = None,
+        *,
+        delay: float = 0.0,
+        max_attempts: Optional[int] = None,
+        commit: Optional[bool] = None,
+    ) -> Job:
+        if name not in self.handlers:
+            raise ValueError(f"No handler registered for job {name!r}")
+        if delay <= 0:
+            # wake this worker's dispatcher once the job is committed instead
+            # of at its next poll
+            event.listen(db.sync_session, "after_commit", self._wake, once=True)
+        return await crud_job.create(
+            db,
+            obj_in=JobCreate(
+                name=name,
+                payload=payload or {},
+                maxAttempts=max_attempts or self.max_attempts,
+                runAt=utcnow() + timedelta(seconds=delay),
+            ),
+            commit=commit,
+        )
+
+    def _wake(self, *args: Any) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        if self._dispatcher is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        logger.info("Job queue started with {} workers", self.workers)
+
+    async def close(self):
+        """Stop claiming and give running jobs `shutdown_timeout` seconds to finish."""
+        if self._dispatcher is None:
+            return
+        dispatcher, self._dispatcher = self._dispatcher, None
+        dispatcher.cancel()
+        await asyncio.gather(dispatcher, return_exceptions=True)
+
+        unstarted = []
+        while not self._queue.empty():
+            unstarted.append(self._queue.get_nowait().id)
+        if unstarted:
+            try:
+                async with self.session() as db:
+                    await crud_job.release(db, ids=unstarted)
+            except Exception as e:
+                logger.warning("Could not release {} claimed jobs: {}", len(unstarted), e)
+
+        for _ in self._tasks:
+            self._queue.put_nowait(None)
+        _, running = await asyncio.wait(self._tasks, timeout=self.shutdown_timeout)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    async def _dispatch(self):
+        while True:
+            self._wakeup.clear()
+            free = self.workers - self._busy - self._queue.qsize()
+            claimed = 0
+            if free > 0:
+                try:
+                    claimed = await self.claim(min(free, self.batch_size))
+                except Exception as e:
+                    logger.warning("Claiming jobs failed: {}", e)
+            if claimed and claimed == min(free, self.batch_size):
+                # more may be due, claim again once a worker is free
+                await asyncio.sleep(0)
+                if self.workers - self._busy - self._queue.qsize() > 0:
+                    continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def claim(self, limit: int) -> int:
+        now = utcnow()
+        async with self.session() as db:
+            jobs = await crud_job.claim(
+                db, limit=limit, now=now, stale_after=timedelta(seconds=2 * self.timeout)
+            )
+        for job in jobs:
+            metrics.JOB_DELAY.observe(max((now - job.runAt).total_seconds(), 0.0))
+            self._queue.put_nowait(job)
+        return len(jobs)
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            if job is None:
+                return
+            self._busy += 1
+            try:
+                await self.run(job)
+            except Exception as e:
+                # the job stays running and is claimed again once it is stale
+                logger.error("Could not record the outcome of job {} ({}): {}", job.id, job.name, e)
+            finally:
+                self._busy -= 1
+                self._wake()
+
+    async def run(self, job: Job) -> str:
+        """Run one claimed job and record the outcome: done, retry or dead."""
+        started = time.perf_counter()
+        try:
+            handler = self.handlers.get(job.name)
+            if handler is None:
+                raise LookupError(f"No handler registered for job {job.name!r}")
+            await asyncio.wait_for(handler(job.payload), self.timeout)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            async with self.session() as db:
+                if job.attempts >= job.maxAttempts:
+                    outcome = "dead"
+                    await crud_job.bury(db, id=job.id, error=error)
+                    logger.error("Job {} ({}) failed {} times, dead-lettered: {}", job.id, job.name, job.attempts, error)
+                else:
+                    outcome = "retry"
+                    delay = self.retry_delay(job.attempts)
+                    await crud_job.retry(db, id=job.id, run_at=utcnow() + timedelta(seconds=delay), error=error)
+                    logger.warning("Job {} ({}) failed, retrying in {:.0f}s: {}", job.id, job.name, delay, error)
+        else:
+            outcome = "done"
+            async with self.session() as db:
+                await crud_job.complete(db, id=job.id)
+        metrics.JOB_DURATION.labels(job.name).observe(time.perf_counter() - started)
+        metrics.JOBS_PROCESSED.labels(job.name, outcome).inc()
+        return outcome
+
+    def retry_delay(self, attempts: int) -> float:
+        # exponential backoff with jitter, so jobs that failed together (e.g.
+        # during an SMTP outage) do not all retry at the same moment
+        delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+job_queue = JobQueue(
+    workers=settings.JOB_WORKERS,
+    batch_size=settings.JOB_BATCH_SIZE,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    timeout=settings.JOB_TIMEOUT_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    backoff=settings.JOB_RETRY_BACKOFF_SECONDS,
+    max_backoff=settings.JOB_RETRY_BACKOFF_MAX_SECONDS,
+    shutdown_timeout=settings.JOB_SHUTDOWN_TIMEOUT_SECONDS,
+)
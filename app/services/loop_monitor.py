@@ -0,0 +1,47 @@
+import asyncio
+from typing import Optional
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import logger
+
+
+class LoopMonitor:
+    """Measures the smoothed event loop lag and counts the requests in flight."""
+
+    def __init__(self, interval: float = 0.1, smoothing: float = 0.3):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.lag = 0.0
+        self.in_flight = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        self.lag = 0.0
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            sample = max(loop.time() - started - self.interval, 0.0)
+            self.lag += self.smoothing * (sample - self.lag)
+            metrics.EVENT_LOOP_LAG.observe(sample)
+            if sample > 1.0:
+                logger.warning("Event loop lag of {:.2f}s with {} requests in flight", sample, self.in_flight)
+
+
+loop_monitor = LoopMonitor(interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000)
@@ -0,0 +1,75 @@
+import abc
+import math
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core import metrics
+from app.core.config import settings
+
+
+class RateLimitStore(abc.ABC):
+    """Where token buckets live; `take` must be atomic per key."""
+
+    @abc.abstractmethod
+    async def take(self, key: str, rate: float, burst: int, cost: float = 1.0) -> float:
+        """Take `cost` tokens, return 0 on success or the seconds until they are available."""
+
+
+class MemoryStore(RateLimitStore):
+    """Per-worker buckets, so limits apply per worker process."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated_at) * rate)
+
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        # the least recently seen buckets are the fullest ones, dropping them
+        # only ever lets a client start again from a full bucket
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RateLimiter:
+    """Token bucket limits `(rate, burst)` per client IP, email and route."""
+
+    def __init__(self, store: Optional[RateLimitStore] = None, enabled: bool = True):
+        self.store = store or MemoryStore()
+        self.enabled = enabled
+
+    async def check(self, scope: str, route: str, key: str, rate: float, burst: int):
+        if not self.enabled or rate <= 0:
+            return
+
+        retry_after = await self.store.take(f"{scope}:{route}:{key}", rate, burst)
+        if retry_after <= 0:
+            metrics.RATE_LIMIT_DECISIONS.labels(scope, route, "allowed").inc()
+            return
+
+        metrics.RATE_LIMIT_DECISIONS.labels(scope, route, "limited").inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please try again later.",
+            headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+        )
+
+
+rate_limiter = RateLimiter(
+    MemoryStore(max_keys=settings.RATE_LIMIT_MAX_KEYS),
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
@@ -0,0 +1,306 @@
+import codecs
+import csv
+import json
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.crud.user import crud_user
+from app.models.user import UserRole
+from app.schemas.user import UserCreate, UserCreateInDB, UserImportError, UserImportReport
+from app.services.hashing import password_hasher
+
+# a row, or the reason it could not be parsed, by 1-based data row number
+Record = Tuple[int, Union[Dict[str, Any], str]]
+
+MAX_LINE_LENGTH = 1 << 20
+# lines a quoted CSV field may span
+MAX_RECORD_LINES = 16
+REQUIRED_COLUMNS = ("username", "email", "phoneNumber", "password")
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # utf-8-sig drops the byte order mark spreadsheet programs put in front
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        if len(pending) > MAX_LINE_LENGTH:
+            raise ValueError(f"Line is longer than {MAX_LINE_LENGTH} characters")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def parse_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """One JSON object per line; blank lines are skipped."""
+    row = 0
+    async for line in _lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield row, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(value, dict):
+            yield row, "Expected a JSON object"
+            continue
+        yield row, value
+
+
+def _ends_in_quotes(line: str, in_quotes: bool) -> bool:
+    """Whether a CSV record is still inside a quoted field after `line`."""
+    if '"' not in line:
+        return in_quotes
+    at_start = not in_quotes
+    after_quote = False
+    for char in line:
+        if in_quotes:
+            if char == '"':
+                in_quotes, after_quote = False, True
+        elif char == '"' and (at_start or after_quote):
+            in_quotes, at_start, after_quote = True, False, False
+        else:
+            at_start, after_quote = char == ",", False
+    return in_quotes
+
+
+class _RecordSplitter:
+    """Groups CSV lines into records, giving up on a line that opens a runaway quote."""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.pending: List[str] = []
+        self.size = 0
+        self.in_quotes = False
+
+    def feed(self, line: str) -> List[Optional[str]]:
+        records: List[Optional[str]] = []
+        backlog = deque([line])
+        while backlog:
+            line = backlog.popleft()
+            self.pending.append(line)
+            self.size += len(line)
+            self.in_quotes = _ends_in_quotes(line, self.in_quotes)
+            if not self.in_quotes:
+                records.append("\n".join(self.pending))
+                self._reset()
+            elif len(self.pending) >= MAX_RECORD_LINES or self.size > MAX_LINE_LENGTH:
+                records.append(None)
+                backlog.extendleft(reversed(self.pending[1:]))
+                self._reset()
+        return records
+
+    def close(self) -> List[Optional[str]]:
+        records: List[Optional[str]] = []
+        while self.pending:
+            records.append(None)
+            rest = self.pending[1:]
+            self._reset()
+            for line in rest:
+                records.extend(self.feed(line))
+        return records
+
+
+async def parse_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """RFC 4180 CSV with a header row, see `_RecordSplitter`."""
+    header: Optional[List[str]] = None
+    row = 0
+
+    def parse(text: Optional[str]) -> Optional[Record]:
+        nonlocal header, row
+        if header is None:
+            if text is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="CSV header has an unterminated quoted field",
+                )
+            header = [name.strip() for name in next(csv.reader([text]))]
+            missing = [name for name in REQUIRED_COLUMNS if name not in header]
+            if missing:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"CSV header is missing the columns: {', '.join(missing)}",
+                )
+            return None
+        if text is None:
+            row += 1
+            return row, "Unterminated quoted field"
+        if not text.strip():
+            return None
+        row += 1
+        values = next(csv.reader([text]))
+        if len(values) != len(header):
+            return row, f"Expected {len(header)} columns, got {len(values)}"
+        return row, dict(zip(header, values))
+
+    splitter = _RecordSplitter()
+    async for line in _lines(chunks):
+        for text in splitter.feed(line):
+            record = parse(text)
+            if record is not None:
+                yield record
+    for text in splitter.close():
+        record = parse(text)
+        if record is not None:
+            yield record
+
+
+class UserImport:
+    """Creates users from parsed rows chunk by chunk and reports the rows that failed."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        chunk_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_errors: Optional[int] = None,
+    ):
+        self.db = db
+        self.chunk_size = chunk_size or settings.USER_IMPORT_CHUNK_SIZE
+        self.max_rows = max_rows or settings.USER_IMPORT_MAX_ROWS
+        self.max_errors = max_errors or settings.USER_IMPORT_MAX_ERRORS
+        self.rows = 0
+        self.created = 0
+        self.failed = 0
+        self.errors: List[UserImportError] = []
+        self.errors_dropped = 0
+        self.hash_seconds = 0.0
+        self.insert_seconds = 0.0
+        # first row of every email and phone number seen in the file
+        self._seen: Dict[str, Dict[str, int]] = {"email": {}, "phoneNumber": {}}
+
+    async def run(self, records: AsyncIterator[Record]) -> UserImportReport:
+        started = time.perf_counter()
+        chunk: List[Tuple[int, UserCreate]] = []
+        async for row, record in self._read(records):
+            if self.rows >= self.max_rows:
+                self._report(row, None, f"Imports are limited to {self.max_rows} rows, the rest was not read")
+                break
+            self.rows += 1
+            if isinstance(record, str):
+                self._fail(row, [(None, record)])
+                continue
+            user = self._validate(row, record)
+            if user is None:
+                continue
+            chunk.append((row, user))
+            if len(chunk) >= self.chunk_size:
+                chunk, full = [], chunk
+                await self._import(full)
+        if chunk:
+            await self._import(chunk)
+
+        seconds = time.perf_counter() - started
+        logger.info(
+            "Imported {} of {} users in {:.1f}s ({:.1f}s hashing, {:.1f}s inserting)",
+            self.created, self.rows, seconds, self.hash_seconds, self.insert_seconds,
+        )
+        return UserImportReport(
+            rows=self.rows,
+            created=self.created,
+            failed=self.failed,
+            # validation errors are found as rows arrive, conflicts per chunk
+            errors=sorted(self.errors, key=lambda error: error.row),
+            errors_truncated=self.errors_dropped > 0,
+            seconds=round(seconds, 3),
+            rows_per_second=round(self.rows / seconds, 1) if seconds else 0.0,
+            hash_seconds=round(self.hash_seconds, 3),
+            insert_seconds=round(self.insert_seconds, 3),
+        )
+
+    async def _read(self, records: AsyncIterator[Record]) -> AsyncIterator[Record]:
+        try:
+            async for record in records:
+                yield record
+        except ValueError as e:
+            # the upload itself is unreadable from here on (encoding, line length)
+            self._report(self.rows + 1, None, f"{e}, the rest was not read")
+
+    def _validate(self, row: int, record: Dict[str, Any]) -> Optional[UserCreate]:
+        # an import has no confirmation column, the copy would repeat the
+        # password's errors
+        confirmed = "password_confirm" in record
+        record.setdefault("password_confirm", record.get("password"))
+        try:
+            return UserCreate(**record)
+        except ValidationError as e:
+            self._fail(row, [
+                (".".join(str(part) for part in error["loc"]) or None, error["msg"])
+                for error in e.errors()
+                if confirmed or error["loc"][:1] != ("password_confirm",)
+            ])
+            return None
+
+    async def _import(self, chunk: List[Tuple[int, UserCreate]]) -> None:
+        taken = await crud_user.taken_unique_values(
+            self.db, [{"email": user.email, "phoneNumber": user.phoneNumber} for _, user in chunk]
+        )
+        accepted = []
+        for row, user in chunk:
+            conflict = None
+            for field in ("email", "phoneNumber"):
+                value = getattr(user, field)
+                if value in self._seen[field]:
+                    conflict = f"Same {field} as row {self._seen[field][value]}"
+                elif value in taken.get(field, ()):
+                    conflict = f"A user with this {field} already exists"
+                if conflict:
+                    self._fail(row, [(field, conflict)])
+                    break
+            else:
+                self._seen["email"][user.email] = row
+                self._seen["phoneNumber"][user.phoneNumber] = row
+                accepted.append((row, user))
+        if not accepted:
+            return
+
+        started = time.perf_counter()
+        hashes = await password_hasher.hash_many([user.password for _, user in accepted])
+        self.hash_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        conflicts = await crud_user.create_many_unique(
+            self.db,
+            objs_in=[
+                UserCreateInDB(
+                    **user.dict(exclude={"password", "password_confirm"}),
+                    passwordHash=hashed,
+                    role=UserRole.INDIVIDUAL_USER,
+                )
+                for (_, user), hashed in zip(accepted, hashes)
+            ],
+            commit=True,
+        )
+        self.insert_seconds += time.perf_counter() - started
+
+        for (row, _), conflict in zip(accepted, conflicts):
+            if conflict is None:
+                self.created += 1
+            else:
+                self._fail(row, [(conflict, f"A user with this {conflict} already exists")])
+
+    def _fail(self, row: int, errors: List[Tuple[Optional[str], str]]) -> None:
+        self.failed += 1
+        for field, message in errors:
+            self._report(row, field, message)
+
+    def _report(self, row: int, field: Optional[str], message: str) -> None:
+        if len(self.errors) < self.max_errors:
+            self.errors.append(UserImportError(row=row, field=field, message=message))
+        else:
+            self.errors_dropped += 1
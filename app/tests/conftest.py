@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base_class import Base
+from app.models.user import User, UserRole
+
+
+@pytest.fixture
+async def engine():
+    # in-memory SQLite standing in for Postgres, shared by every session
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(engine):
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+
+@pytest.fixture
+async def users(db):
+    """user1 .. user5 with ids 1 .. 5, the odd ones active."""
+    rows = [
+        User(
+            username=f"user{n}", email=f"user{n}@example.com", phoneNumber=str(n),
+            passwordHash="x", role=UserRole.INDIVIDUAL_USER.value, isActive=n % 2 == 1,
+        )
+        for n in range(1, 6)
+    ]
+    db.add_all(rows)
+    await db.commit()
+    return rows
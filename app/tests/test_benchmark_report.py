@@ -0,0 +1,28 @@
+from benchmarks.report import Result, compare, percentile, render
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_compare_flags_latency_and_throughput_regressions():
+    result = Result("load.me", latencies=[0.01] * 100, elapsed=1.0)
+    baseline = {"load.me": {"p95_ms": 5.0, "throughput": 200.0, "errors": 0}}
+
+    regressions = compare([result], baseline, tolerance=0.2)
+    assert len(regressions) == 2
+    assert compare([result], {"load.me": result.summary()}, tolerance=0.2) == []
+    assert compare([result], {}, tolerance=0.2) == []
+
+
+def test_render_aligns_long_names():
+    lines = render([
+        Result("micro.decode_access_token_uncached", latencies=[0.001], elapsed=1.0),
+        Result("load.me", latencies=[0.001], elapsed=1.0),
+    ]).splitlines()
+
+    # every column ends at the same offset on every line
+    assert len({len(line) for line in lines}) == 1
@@ -0,0 +1,31 @@
+import time
+
+from app.core.cache import TTLCache
+
+
+def test_lru_eviction_and_counters():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    assert cache.get(1) == "a"
+    cache.set(3, "c")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+    assert cache.stats() == {"hits": 3, "misses": 1, "size": 2}
+
+
+def test_entries_expire():
+    cache = TTLCache(ttl=0.01)
+    cache.set("key", "value")
+    time.sleep(0.02)
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_disabled_cache_stores_nothing():
+    cache = TTLCache(enabled=False)
+    cache.set("key", "value")
+    assert cache.get("key") is None
+    assert len(cache) == 0
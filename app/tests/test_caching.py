@@ -0,0 +1,55 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import httpx
+from fastapi import APIRouter, FastAPI
+
+from app.api.caching import CacheableRoute, cache_response, weak_etag
+from app.api.deps import get_current_user
+from app.main import app
+
+
+async def request(app: FastAPI, path: str, **headers) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+async def test_me_answers_304_for_matching_etag():
+    user = SimpleNamespace(
+        id=1, email="a@example.com", username="alice", role=2, organizationId=None,
+        isActive=True, isDeleted=False, createdAt=datetime(2024, 1, 1), updatedAt=datetime(2024, 1, 2),
+    )
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        first = await request(app, "/api/v1/auth/me")
+        etag = first.headers["etag"]
+        assert first.status_code == 200 and etag == weak_etag(1, user.updatedAt)
+
+        assert (await request(app, "/api/v1/auth/me", **{"If-None-Match": etag})).status_code == 304
+
+        user.updatedAt = datetime(2024, 1, 3)
+        assert (await request(app, "/api/v1/auth/me", **{"If-None-Match": etag})).status_code == 200
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+async def test_cache_response_serves_hits_without_running_the_endpoint():
+    calls = []
+    router = APIRouter(route_class=CacheableRoute)
+
+    @router.get("/items")
+    @cache_response(ttl=60)
+    async def items():
+        calls.append(1)
+        return {"count": len(calls)}
+
+    cached_app = FastAPI()
+    cached_app.include_router(router)
+
+    first = await request(cached_app, "/items")
+    second = await request(cached_app, "/items")
+    assert first.json() == second.json() == {"count": 1}
+    assert second.headers["cache-control"].startswith("private, max-age=")
+    assert (await request(cached_app, "/items", **{"If-None-Match": first.headers["etag"]})).status_code == 304
+    assert (await request(cached_app, "/items", Authorization="Bearer other")).json() == {"count": 2}
+    assert (await request(cached_app, "/items", **{"Cache-Control": "no-cache"})).json() == {"count": 3}
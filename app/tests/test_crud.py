@@ -0,0 +1,230 @@
+import asyncio
+
+import pytest
+from sqlalchemy.future import select
+
+from app.crud.base import CRUDBase
+from app.crud.loader import ModelLoader
+from app.crud.user import crud_user, principal_cache
+from app.models.user import User, UserRole
+from app.schemas.user import UserCreate, UserCreateInDB
+
+
+def test_filter_shape_ignores_values():
+    shape_a, params_a = crud_user._filter_shape({"username": ("john", "ilike"), "id": ([1, 2], "in")})
+    shape_b, params_b = crud_user._filter_shape({"username": ("jane", "ilike"), "id": ([3], "in")})
+
+    assert shape_a == shape_b
+    assert params_a == {"f0": "%john%", "f1": [1, 2]}
+    assert params_b == {"f0": "%jane%", "f1": [3]}
+    assert crud_user._filter_shape({"email": (True, "is_null")})[0] != crud_user._filter_shape({"email": (False, "is_null")})[0]
+
+
+def test_equality_filters_on_none_compile_to_is_null():
+    shape, params = crud_user._filter_shape({"email": (None, "="), "phoneNumber": (None, "!=")})
+    sql = str(crud_user._filter_clause(shape))
+
+    assert params == {}
+    assert "email IS NULL" in sql and '"phoneNumber" IS NOT NULL' in sql
+    assert shape != crud_user._filter_shape({"email": ("a@example.com", "="), "phoneNumber": (None, "!=")})[0]
+
+
+def test_indexed_search_operators_escape_wildcards():
+    _, params = crud_user._filter_shape({
+        "username": ("50%_off", "prefix"),
+        "phoneNumber": ("a_b", "contains"),
+        "email": ("A@Example.com", "iexact"),
+    })
+
+    assert params == {"f0": "50\\%\\_off%", "f1": "%a\\_b%", "f1_q": "a_b", "f2": "A@Example.com"}
+
+
+def test_filter_shape_rejects_unknown_fields_and_operators():
+    with pytest.raises(ValueError):
+        crud_user._filter_shape({"missing": (1, "=")})
+    with pytest.raises(ValueError):
+        crud_user._filter_shape({"id": (1, "~")})
+    with pytest.raises(ValueError):
+        crud_user._filter_shape({"id": (1, "in")})
+
+
+def test_with_deleted_does_not_mutate_shared_instance():
+    scoped = crud_user.with_deleted()
+
+    assert scoped._with_deleted
+    assert not crud_user._with_deleted
+    assert scoped._statement_cache is crud_user._statement_cache
+
+
+async def test_create_unique_reports_the_conflicting_column(db):
+    crud = CRUDBase(User)
+
+    def user(email, phone):
+        return UserCreateInDB(username=f"user{phone}", email=email, phoneNumber=phone, passwordHash="x")
+
+    created, conflict = await crud.create_unique(db, obj_in=user("a@example.com", "1000000000"))
+    assert created.id is not None and conflict is None
+    assert [
+        await crud.create_unique(db, obj_in=user("a@example.com", "2000000000")),
+        await crud.create_unique(db, obj_in=user("b@example.com", "1000000000")),
+    ] == [(None, "email"), (None, "phoneNumber")]
+
+
+async def test_user_create_unique_skips_bcrypt_for_duplicates(db, monkeypatch):
+    hashed = []
+
+    async def fake_hash(password):
+        hashed.append(password)
+        return "x"
+
+    monkeypatch.setattr("app.crud.user.password_hasher.hash", fake_hash)
+
+    def user(email, phone):
+        return UserCreate(
+            username=f"user{phone}", email=email, phoneNumber=phone,
+            password="pass1234", password_confirm="pass1234",
+        )
+
+    await crud_user.create_unique(db, obj_in=user("a@example.com", "100"))
+    assert [
+        await crud_user.create_unique(db, obj_in=user("a@example.com", "200")),
+        await crud_user.create_unique(db, obj_in=user("b@example.com", "100")),
+    ] == [(None, "email"), (None, "phoneNumber")]
+    assert len(hashed) == 1
+
+
+async def test_create_many_unique_skips_conflicts_within_and_across_chunks(db):
+    crud = CRUDBase(User)
+
+    def user(email, phone):
+        return UserCreateInDB(username=f"user{phone}", email=email, phoneNumber=phone, passwordHash="x")
+
+    await crud.create(db, obj_in=user("taken@example.com", "1"))
+    conflicts = await crud.create_many_unique(db, chunk_size=2, objs_in=[
+        user("a@example.com", "2"),
+        user("taken@example.com", "3"),
+        user("b@example.com", "1"),
+        user("a@example.com", "4"),
+        user("c@example.com", "5"),
+    ])
+    emails = (await db.scalars(select(User.email).order_by(User.id))).all()
+
+    assert conflicts == [None, "email", "phoneNumber", "email", None]
+    assert emails == ["taken@example.com", "a@example.com", "c@example.com"]
+
+
+async def test_count_is_exact_off_postgres_and_cached(db):
+    crud = CRUDBase(User, use_logical_delete=True)
+    for name in ("alice", "alicia", "bob"):
+        await crud.create(db, obj_in=UserCreateInDB(
+            username=name, email=f"{name}@example.com", phoneNumber=name, passwordHash="x"
+        ))
+    await crud.delete(db, id=3)
+
+    counts = [
+        await crud.count(db),
+        await crud.with_deleted().count(db),
+        await crud.count(db, {"username": ("ali", "prefix")}),
+    ]
+    misses = crud._count_cache.misses
+    await crud.count(db, {"username": ("ali", "prefix")})
+
+    assert [(count.total, count.is_estimate) for count in counts] == [(2, False), (3, False), (2, False)]
+    assert crud._count_cache.misses == misses
+
+
+async def test_loader_runs_overlapping_batches_one_at_a_time(db, users):
+    execute, running, overlaps = db.execute, [], []
+
+    async def slow_execute(*args, **kwargs):
+        overlaps.append(bool(running))
+        running.append(1)
+        await asyncio.sleep(0.05)
+        try:
+            return await execute(*args, **kwargs)
+        finally:
+            running.pop()
+
+    db.execute = slow_execute
+    loader = ModelLoader(User, db)
+    first = asyncio.ensure_future(loader.load_many([1, 2]))
+    # the first batch is waiting on the database when the second one starts
+    await asyncio.sleep(0.01)
+    second = await loader.load_many([3, 1])
+
+    assert [user.username for user in await first] == ["user1", "user2"]
+    assert [user.username for user in second] == ["user3", "user1"]
+    assert overlaps == [False, False]
+
+
+async def test_principal_cache_is_evicted_again_after_the_commit(db, users):
+    principal_cache.clear()
+    db.info["unit_of_work"] = True
+
+    user = await crud_user.get_principal(db, id=1)
+    await crud_user.update(db, db_obj=user, obj_in={"isActive": False})
+    # a request on another session caches the row before this one commits
+    principal_cache.set(1, {"id": 1, "isActive": True})
+    assert principal_cache.get(1) is not None
+    await db.commit()
+
+    assert principal_cache.get(1) is None
+
+
+async def test_create_many_drops_unknown_keys_and_takes_mixed_rows(db):
+    crud = CRUDBase(User)
+
+    def rows(*names):
+        return [
+            {"username": names[0], "email": f"{names[0]}@example.com", "phoneNumber": names[0], "passwordHash": "x", "role": 2, "note": "?"},
+            {"username": names[1], "email": f"{names[1]}@example.com", "phoneNumber": names[1], "passwordHash": "x", "role": 2, "isActive": False},
+        ]
+
+    created = await crud.create_many(db, objs_in=rows("ann", "ben"))
+    assert [(user.username, user.isActive) for user in created] == [("ann", True), ("ben", False)]
+    assert await crud.create_many(db, objs_in=rows("cat", "dan"), returning=False) == 2
+
+
+def test_copy_lists_every_given_column_and_the_scalar_defaults():
+    columns = CRUDBase(User)._copy_columns([
+        {"username": "ann", "email": "ann@example.com", "passwordHash": "x"},
+        {"username": "ben", "phoneNumber": "2", "isActive": False},
+    ])
+
+    assert sorted((col.key, default) for col, default in columns) == sorted([
+        ("username", None), ("email", None), ("phoneNumber", None), ("passwordHash", None),
+        ("isDeleted", False), ("role", UserRole.INDIVIDUAL_USER), ("isActive", True),
+    ])
+
+
+async def test_update_many_groups_rows_by_fields(db, users):
+    updated = await crud_user.update_many(db, objs_in=[
+        {"id": 1, "username": "first"},
+        {"id": 2, "isActive": True},
+        {"id": 3, "username": "third", "isActive": False},
+    ])
+    rows = (await db.execute(select(User.username, User.isActive).order_by(User.id))).all()
+
+    assert updated == 3
+    assert rows[:3] == [("first", True), ("user2", True), ("third", False)]
+    with pytest.raises(ValueError):
+        await crud_user.update_many(db, objs_in=[{"id": 1, "missing": 1}])
+    with pytest.raises(ValueError):
+        await crud_user.update_many(db, objs_in=[{"username": "no id"}])
+
+
+async def test_delete_many_honors_logical_delete(db, users):
+    assert await crud_user.delete_many(db, ids=[1, 2]) == 2
+    # already deleted rows are not counted again
+    assert await crud_user.delete_many(db, ids=[2, 3]) == 1
+    assert (await crud_user.count(db)).total == 2
+    assert await CRUDBase(User).delete_many(db, ids=[1, 4]) == 2
+    assert (await crud_user.with_deleted().count(db)).total == 3
+
+
+async def test_update_returns_server_values_and_rejects_unknown_fields(db, users):
+    user = await crud_user.update(db, db_obj=users[0], obj_in={"username": "renamed"})
+
+    assert (user.username, user.updatedAt is not None) == ("renamed", True)
+    with pytest.raises(ValueError):
+        await crud_user.update(db, db_obj=user, obj_in={"username": "again", "missing": 1})
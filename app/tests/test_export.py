@@ -0,0 +1,56 @@
+import contextlib
+import csv
+import io
+import json
+from types import SimpleNamespace
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user
+from app.main import app
+from app.models.user import UserRole
+
+
+async def _export(monkeypatch, engine, role: UserRole, path: str) -> httpx.Response:
+    @contextlib.asynccontextmanager
+    async def session():
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            yield db
+
+    monkeypatch.setattr("app.api.v1.endpoints.user.sessionmanager", SimpleNamespace(session=session))
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(role=role.value)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(path)
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+async def test_export_streams_ndjson_rows(monkeypatch, engine, users):
+    response = await _export(monkeypatch, engine, UserRole.SYSTEM_ADMIN, "/api/v1/users/export?is_active=true")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [(row["id"], row["username"], row["email"]) for row in rows] == [
+        (1, "user1", "user1@example.com"), (3, "user3", "user3@example.com"), (5, "user5", "user5@example.com"),
+    ]
+
+
+async def test_export_streams_csv_with_a_header(monkeypatch, engine, users):
+    response = await _export(monkeypatch, engine, UserRole.SYSTEM_ADMIN, "/api/v1/users/export?format=csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert response.headers["content-disposition"] == "attachment; filename=users.csv"
+    assert response.text.splitlines()[0] == "email,id,username,role,organizationId,isActive,createdAt,updatedAt"
+    assert [(row["username"], row["role"], row["isActive"]) for row in rows[:2]] == [
+        ("user1", "2", "True"), ("user2", "2", "False"),
+    ]
+    assert len(rows) == 5
+
+
+async def test_export_is_admin_only(monkeypatch, engine):
+    response = await _export(monkeypatch, engine, UserRole.INDIVIDUAL_USER, "/api/v1/users/export")
+
+    assert response.status_code == 403
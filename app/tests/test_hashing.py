@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.hashing import PasswordHasher
+
+
+async def test_hash_and_verify_roundtrip():
+    hasher = PasswordHasher(max_workers=1)
+
+    hashed = await hasher.hash("secret123")
+    assert await hasher.verify("secret123", hashed)
+    assert not await hasher.verify("wrong123", hashed)
+
+    stats = hasher.stats()
+    assert stats["jobs"] == 3
+    assert stats["pending"] == 0
+    assert stats["hash_seconds"] > 0
+
+
+async def test_saturated_queue_fails_fast():
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+
+    first = asyncio.ensure_future(hasher.hash("secret123"))
+    await asyncio.sleep(0)
+    with pytest.raises(HTTPException) as exc_info:
+        await hasher.hash("secret123")
+    await first
+
+    assert exc_info.value.status_code == 503
+    assert hasher.stats()["rejected"] == 1
+
+
+def test_pool_splits_the_cores_between_web_workers(monkeypatch):
+    monkeypatch.setattr("app.services.hashing.available_cpus", lambda: 8)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    assert PasswordHasher().max_workers == 2
+
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 16)
+    assert PasswordHasher().max_workers == 1
+
+
+async def test_hashes_in_the_process_pool():
+    hasher = PasswordHasher(max_workers=2)
+    hasher.start()
+    try:
+        hashed = await hasher.hash("secret123")
+        batch = await hasher.hash_many(["secret123", "other123"], batch_size=1)
+        assert await hasher.verify("secret123", hashed)
+        assert await hasher.verify("other123", batch[1])
+    finally:
+        await hasher.close()
+
+    assert hasher._executor is None
+    assert hasher.stats()["jobs"] == 5
@@ -4,6 +4,6 @@ from app.main import app
 client = TestClient(app)
 
 def test_health_check():
-    response = client.get("/api/v1/health")
+    response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
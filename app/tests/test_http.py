@@ -0,0 +1,38 @@
+import asyncio
+from collections import Counter
+
+import httpx
+
+from app.core.config import settings
+from app.services.http import HTTPService
+
+
+async def test_requests_are_limited_per_host_and_take_a_per_call_timeout(monkeypatch):
+    in_flight, peak, timeouts = Counter(), Counter(), {}
+
+    async def handler(request):
+        host = request.url.host
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        await asyncio.sleep(0.02)
+        in_flight[host] -= 1
+        timeouts[request.url.path] = request.extensions["timeout"]["read"]
+        return httpx.Response(200, json={"ok": True})
+
+    monkeypatch.setattr(settings, "HTTP_MAX_CONNECTIONS_PER_HOST", 2)
+    monkeypatch.setattr(HTTPService, "_host_limits", {})
+    monkeypatch.setattr(
+        HTTPService, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler), timeout=10.0)
+    )
+
+    responses = await asyncio.gather(
+        *[HTTPService.request("GET", f"https://a.example/{n}") for n in range(6)],
+        *[HTTPService.request("GET", f"https://b.example/{n}") for n in range(2)],
+        HTTPService.request("GET", "https://c.example/fast", timeout=0.5),
+    )
+    await HTTPService.close()
+
+    assert all(response.status_code == 200 for response in responses)
+    assert peak == {"a.example": 2, "b.example": 2, "c.example": 1}
+    assert timeouts["/fast"] == 0.5
+    assert timeouts["/0"] == 10.0
@@ -0,0 +1,158 @@
+import asyncio
+import contextlib
+import email
+import re
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.security import verify_reset_token
+from app.models.job import Job, JobStatus
+from app.services.email import queue_reset_email
+from app.services.jobs import JobQueue, job_queue, utcnow
+
+
+@pytest.fixture
+def session(engine):
+    # a session per use, like the queue's own session factory
+    @contextlib.asynccontextmanager
+    async def factory():
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            yield db
+
+    return factory
+
+
+async def _jobs(session):
+    async with session() as db:
+        return (await db.scalars(select(Job))).all()
+
+
+async def _empty(session):
+    return not await _jobs(session)
+
+
+async def _wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+class _SMTPSink:
+    """Accepts every message and keeps it, just enough SMTP for smtplib."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle(self, reader, writer):
+        try:
+            await self._session(reader, writer)
+        except asyncio.CancelledError:
+            # the client may keep its connection open until the loop ends
+            pass
+        writer.close()
+
+    async def _session(self, reader, writer):
+        writer.write(b"220 sink ready\r\n")
+        lines, in_data = [], False
+        while line := await reader.readline():
+            if in_data:
+                if line == b".\r\n":
+                    self.messages.append(email.message_from_bytes(b"".join(lines)))
+                    lines, in_data = [], False
+                    writer.write(b"250 queued\r\n")
+                else:
+                    lines.append(line)
+            elif line[:4].upper() == b"DATA":
+                in_data = True
+                writer.write(b"354 end with .\r\n")
+            elif line[:4].upper() == b"QUIT":
+                writer.write(b"221 bye\r\n")
+                break
+            else:
+                writer.write(b"250 ok\r\n")
+            await writer.drain()
+
+
+async def test_workers_run_jobs_claimed_in_batches(session):
+    queue = JobQueue(workers=2, batch_size=2, poll_interval=0.05, session_factory=session)
+    seen = []
+
+    @queue.handler("record")
+    async def record(payload):
+        await asyncio.sleep(0.01)
+        seen.append(payload["n"])
+
+    async with session() as db:
+        for n in range(5):
+            await queue.enqueue(db, "record", {"n": n}, commit=False)
+        await db.commit()
+
+    queue.start()
+    await _wait_for(lambda: _empty(session))
+    await queue.close()
+
+    assert sorted(seen) == [0, 1, 2, 3, 4]
+
+
+async def test_failed_jobs_back_off_then_go_to_the_dead_letter_state(session):
+    queue = JobQueue(workers=1, backoff=10, max_backoff=15, session_factory=session)
+    # run the claimed jobs by hand instead of through start()
+    queue._queue = asyncio.Queue()
+
+    @queue.handler("flaky")
+    async def flaky(payload):
+        raise ConnectionError("smtp down")
+
+    async with session() as db:
+        await queue.enqueue(db, "flaky", max_attempts=2)
+
+    outcomes, run_at = [], []
+    for _ in range(2):
+        async with session() as db:
+            job = (await db.scalars(select(Job))).one()
+            job.runAt = utcnow() - timedelta(seconds=1)
+            await db.commit()
+        await queue.claim(1)
+        outcomes.append(await queue.run(queue._queue.get_nowait()))
+        run_at.append((await _jobs(session))[0].runAt)
+
+    job = (await _jobs(session))[0]
+    assert outcomes == ["retry", "dead"]
+    assert run_at[0] > utcnow() + timedelta(seconds=4)
+    assert job.status == JobStatus.DEAD.value
+    assert job.attempts == 2
+    assert job.lastError == "ConnectionError: smtp down"
+
+
+async def test_reset_email_is_sent_by_a_worker(session, monkeypatch):
+    sink = _SMTPSink()
+    server = await asyncio.start_server(sink.handle, "127.0.0.1", 0)
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", server.sockets[0].getsockname()[1])
+    monkeypatch.setattr(settings, "SMTP_TLS", False)
+    monkeypatch.setattr(job_queue, "_session_factory", session)
+    monkeypatch.setattr(job_queue, "poll_interval", 0.05)
+
+    async with session() as db:
+        await queue_reset_email(db, "jane@example.com")
+    # the job row never holds the token, the worker mints it
+    assert [job.payload for job in await _jobs(session)] == [{"email": "jane@example.com"}]
+
+    job_queue.start()
+    try:
+        await _wait_for(lambda: _empty(session))
+    finally:
+        await job_queue.close()
+        server.close()
+        await server.wait_closed()
+
+    message = sink.messages[0]
+    html = next(part for part in message.walk() if part.get_content_type() == "text/html")
+    token = re.search(r"token=([\w.-]+)", html.get_payload(decode=True).decode()).group(1)
+    assert message["To"] == "jane@example.com"
+    assert verify_reset_token(token) == "jane@example.com"
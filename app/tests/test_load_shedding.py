@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.middleware import LoadSheddingMiddleware
+from app.services.loop_monitor import LoopMonitor
+
+
+def make_app(monitor: LoopMonitor) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        LoadSheddingMiddleware, monitor=monitor, max_lag=0.1, max_in_flight=2,
+        critical_paths=["/health"],
+    )
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/users")
+    async def users():
+        return []
+
+    return app
+
+
+async def get(app: FastAPI, path: str) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get(path)
+
+
+async def test_sheds_low_priority_routes_while_lagging():
+    monitor = LoopMonitor()
+    app = make_app(monitor)
+    assert (await get(app, "/users")).status_code == 200
+
+    monitor.lag = 0.5
+    response = await get(app, "/users")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert (await get(app, "/health")).status_code == 200
+
+
+async def test_sheds_when_too_many_requests_are_in_flight():
+    monitor = LoopMonitor()
+    monitor.in_flight = 2
+    app = make_app(monitor)
+    assert (await get(app, "/users")).status_code == 503
+    assert (await get(app, "/health")).status_code == 200
+    assert monitor.in_flight == 2
+
+
+async def test_monitor_measures_blocked_loop():
+    monitor = LoopMonitor(interval=0.01, smoothing=1.0)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)
+    await asyncio.sleep(0.001)
+    lag = monitor.lag
+    await monitor.close()
+
+    assert lag >= 0.05
@@ -0,0 +1,22 @@
+import io
+
+from app.core.logging import BatchedSink, Sampler
+
+
+def test_sampler_prefers_the_most_specific_rule():
+    sampler = Sampler("DEBUG=0.01,app.services=0.5,app.services.http:INFO=0")
+
+    assert sampler.rate("app.services.http", "INFO") == 0.0
+    assert sampler.rate("app.services.http", "DEBUG") == 0.5
+    assert sampler.rate("app.crud.base", "DEBUG") == 0.01
+    assert sampler.rate("app.crud.base", "INFO") == 1.0
+
+
+def test_batched_sink_writes_everything_on_close():
+    stream = io.StringIO()
+    sink = BatchedSink(stream, batch_size=1000, flush_interval=60)
+    for i in range(3):
+        sink.write(f"line {i}\n")
+    sink.close()
+
+    assert stream.getvalue() == "line 0\nline 1\nline 2\n"
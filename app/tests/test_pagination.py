@@ -0,0 +1,47 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.crud.pagination import NEXT, decode_cursor, encode_cursor, parse_order_by
+from app.crud.user import crud_user
+from app.models.user import User
+
+
+def test_parse_order_by_appends_id_tie_breaker():
+    assert parse_order_by(User, ["-createdAt"]) == [("createdAt", True), ("id", True)]
+    assert parse_order_by(User, ["username", "id"]) == [("username", False), ("id", False)]
+    with pytest.raises(ValueError):
+        parse_order_by(User, ["missing"])
+
+
+def test_cursor_roundtrip():
+    keys = parse_order_by(User, ["createdAt"])
+    row = SimpleNamespace(createdAt=datetime(2024, 5, 1, 12, 30), id=42)
+
+    cursor = encode_cursor(row, keys, NEXT)
+    assert decode_cursor(cursor, keys) == ([row.createdAt, 42], NEXT)
+
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, parse_order_by(User, ["-createdAt"]))
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", keys)
+
+
+async def _pages(db, order_by, limit=2):
+    pages, cursor = [], None
+    while True:
+        page = await crud_user.get_page(db, limit=limit, cursor=cursor, order_by=order_by)
+        pages.append([user.id for user in page.items])
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+async def test_pages_with_mixed_directions_on_a_boolean_key(db, users):
+    assert await _pages(db, ["-isActive", "username"]) == [[1, 3], [5, 2], [4]]
+
+
+async def test_pages_on_the_default_created_at_order(db, users):
+    # rows created within the same second only differ by id
+    assert await _pages(db, None) == [[1, 2], [3, 4], [5]]
@@ -0,0 +1,23 @@
+import time
+
+from app.core import profiling
+from app.core.config import settings
+
+
+def test_profile_token_is_signed_and_expires(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_SECRET", "secret")
+
+    token = profiling.make_profile_token()
+    assert profiling.verify_profile_token(token)
+    assert not profiling.verify_profile_token(token[:-1] + ("0" if token[-1] != "0" else "1"))
+    assert not profiling.verify_profile_token("not-a-token")
+
+    stale = profiling.make_profile_token(now=time.time() - settings.PROFILING_TOKEN_TTL_SECONDS - 10)
+    assert not profiling.verify_profile_token(stale)
+
+
+def test_tokens_are_rejected_without_secret(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_SECRET", "secret")
+    token = profiling.make_profile_token()
+    monkeypatch.setattr(settings, "PROFILING_SECRET", "")
+    assert not profiling.verify_profile_token(token)
@@ -0,0 +1,32 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services.rate_limit import MemoryStore, RateLimiter
+
+
+async def test_bucket_allows_burst_then_reports_retry_after():
+    store = MemoryStore()
+    taken = [await store.take("key", rate=0.5, burst=3) for _ in range(4)]
+
+    assert taken[:3] == [0.0, 0.0, 0.0]
+    assert 1.9 < taken[3] <= 2.0
+    assert await store.take("other", rate=0.5, burst=3) == 0.0
+
+
+async def test_limiter_raises_429_with_retry_after():
+    limiter = RateLimiter(MemoryStore())
+
+    await limiter.check("ip", "login", "10.0.0.1", rate=0.2, burst=1)
+    with pytest.raises(HTTPException) as exc:
+        await limiter.check("ip", "login", "10.0.0.1", rate=0.2, burst=1)
+    assert exc.value.status_code == 429
+    assert exc.value.headers == {"Retry-After": "5"}
+
+
+async def test_memory_store_is_bounded():
+    store = MemoryStore(max_keys=2)
+
+    for key in ("a", "b", "c"):
+        await store.take(key, rate=1, burst=1)
+
+    assert list(store._buckets) == ["b", "c"]
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+import pytest
+from jwt.exceptions import InvalidTokenError
+
+from app.core import security
+
+
+@pytest.fixture(autouse=True)
+def restore_keys():
+    rings = {name: (ring.current_kid, dict(ring._keys)) for name, ring in security.key_rings.items()}
+    security.verified_token_cache.clear()
+    yield
+    for name, (kid, keys) in rings.items():
+        security.key_rings[name].current_kid = kid
+        security.key_rings[name]._keys = keys
+    security.verified_token_cache.clear()
+
+
+def test_access_tokens_are_cached_until_retired():
+    previous = security.key_rings["access"].current_kid
+    old_token = security._create_token(1, timedelta(minutes=5), "access")
+    hits = security.verified_token_cache.hits
+    assert security.decode_access_token(old_token).sub == "1"
+    assert security.decode_access_token(old_token).sub == "1"
+    assert security.verified_token_cache.hits == hits + 1
+
+    security.rotate_key("access", "access-2", "new-secret")
+    new_token = security._create_token(2, timedelta(minutes=5), "access")
+    assert security.decode_access_token(new_token).sub == "2"
+    assert len(security.verified_token_cache) == 2
+
+    security.retire_key("access", previous)
+
+    assert len(security.verified_token_cache) == 1
+    assert security.decode_access_token(new_token).sub == "2"
+    with pytest.raises(InvalidTokenError):
+        security.decode_access_token(old_token)
+
+
+def test_expired_tokens_are_rejected_and_not_cached():
+    token = security._create_token(1, timedelta(seconds=-1), "access")
+    with pytest.raises(InvalidTokenError):
+        security.decode_access_token(token)
+    assert len(security.verified_token_cache) == 0
@@ -0,0 +1,47 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.future import select
+
+from app.crud.explain import Explain
+from app.db.session import DatabaseSessionManager, ReplicaRouter, RoutingSession
+from app.models.user import User
+
+
+async def test_engines_are_created_lazily_and_rebuilt_after_fork():
+    manager = DatabaseSessionManager()
+    assert manager._engine is None
+
+    manager.init()
+    engine = manager._engine
+    manager.init()
+    assert manager._engine is engine
+
+    # what a forked child sees: state initialized by another process
+    manager._pid = -1
+    manager.init()
+    assert manager._engine is not engine
+
+    await manager.close()
+    assert manager._engine is None
+
+
+async def test_reads_go_to_the_replica_until_the_session_writes():
+    primary = create_async_engine("sqlite+aiosqlite://")
+    replica = create_async_engine("sqlite+aiosqlite://")
+    session = type("Session", (RoutingSession,), {"router": ReplicaRouter(primary, [replica])})()
+
+    def bind(clause):
+        return "replica" if session.get_bind(clause=clause) is replica.sync_engine else "primary"
+
+    assert bind(select(User)) == "replica"
+    assert bind(text("SELECT reltuples::bigint FROM pg_class")) == "replica"
+    assert bind(Explain(select(User))) == "replica"
+    assert bind(select(User).with_for_update()) == "primary"
+    assert bind(select(User)) == "replica"
+
+    assert bind(User.__table__.update().values(isActive=False)) == "primary"
+    assert bind(select(User)) == "primary"
+
+    session.close()
+    await primary.dispose()
+    await replica.dispose()
@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy.future import select
+
+from app.models.user import User, UserRole
+from app.services.hashing import password_hasher
+from app.services.user_import import UserImport, parse_csv, parse_ndjson
+
+
+async def _chunks(data: bytes, size: int = 7):
+    # split mid-line and mid-character, like a network stream would
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def _collect(records):
+    return [record async for record in records]
+
+
+async def test_csv_parser_handles_bom_quoted_newlines_and_bad_rows():
+    data = (
+        '﻿username,email,phoneNumber,password\r\n'
+        '"Jöhn, Jr.",john@example.com,100,pass1234\r\n'
+        '"multi\nline",multi@example.com,101,pass1234\r\n'
+        '\r\n'
+        'short,row\r\n'
+        'last,last@example.com,102,"pass""1234"'
+    ).encode()
+
+    records = await _collect(parse_csv(_chunks(data)))
+
+    assert records == [
+        (1, {"username": "Jöhn, Jr.", "email": "john@example.com", "phoneNumber": "100", "password": "pass1234"}),
+        (2, {"username": "multi\nline", "email": "multi@example.com", "phoneNumber": "101", "password": "pass1234"}),
+        (3, "Expected 4 columns, got 2"),
+        (4, {"username": "last", "email": "last@example.com", "phoneNumber": "102", "password": 'pass"1234'}),
+    ]
+
+
+async def test_csv_parser_gives_up_a_stray_quote_after_one_row():
+    rows = [f"user{i},user{i}@example.com,{i},pass1234" for i in range(40)]
+    rows[0] = '"Brien,brien@example.com,1000,pass1234'
+    rows[30] = 'O"Brien,obrien@example.com,1001,pass1234'
+    data = ("username,email,phoneNumber,password\n" + "\n".join(rows)).encode()
+
+    records = await _collect(parse_csv(_chunks(data)))
+
+    assert len(records) == 40
+    assert records[0] == (1, "Unterminated quoted field")
+    assert records[1] == (2, {"username": "user1", "email": "user1@example.com", "phoneNumber": "1", "password": "pass1234"})
+    assert records[30] == (31, {"username": 'O"Brien', "email": "obrien@example.com", "phoneNumber": "1001", "password": "pass1234"})
+    assert records[-1] == (40, {"username": "user39", "email": "user39@example.com", "phoneNumber": "39", "password": "pass1234"})
+
+
+async def test_ndjson_parser_reports_invalid_lines():
+    data = b'{"username": "john"}\n\nnot json\n[1]\n'
+
+    records = await _collect(parse_ndjson(_chunks(data)))
+
+    assert records[0] == (1, {"username": "john"})
+    assert records[1][0] == 2 and records[1][1].startswith("Invalid JSON")
+    assert records[2] == (3, "Expected a JSON object")
+
+
+async def test_import_creates_users_and_reports_each_failed_row(db):
+    rows = [
+        '{"username": "existing", "email": "taken@example.com", "phoneNumber": "200", "password": "pass1234"}',
+        '{"username": "alice", "email": "alice@example.com", "phoneNumber": "201", "password": "pass1234"}',
+        '{"username": "bob", "email": "bob@example.com", "phoneNumber": "202", "password": "short"}',
+        '{"username": "carol", "email": "alice@example.com", "phoneNumber": "203", "password": "pass1234"}',
+        '{"username": "dave", "email": "dave@example.com", "phoneNumber": "204", "password": "pass1234"}',
+    ]
+    db.add(User(username="existing", email="taken@example.com", phoneNumber="100", passwordHash="x", role=UserRole.INDIVIDUAL_USER.value))
+    await db.commit()
+
+    report = await UserImport(db, chunk_size=2).run(parse_ndjson(_chunks("\n".join(rows).encode())))
+    emails = (await db.scalars(select(User.email).order_by(User.id))).all()
+
+    assert (report.rows, report.created, report.failed) == (5, 2, 3)
+    assert emails == ["taken@example.com", "alice@example.com", "dave@example.com"]
+    assert [(error.row, error.field) for error in report.errors] == [
+        (1, "email"), (3, "password"), (4, "email"),
+    ]
+    assert report.errors[2].message == "Same email as row 2"
+    assert report.rows_per_second > 0
+
+
+async def test_import_rejects_overlong_passwords_and_never_retries_a_chunk(db, monkeypatch):
+    rows = [
+        '{"username": "alice", "email": "alice@example.com", "phoneNumber": "301", "password": "pass1234"}',
+        '{"username": "bob", "email": "bob@example.com", "phoneNumber": "302", "password": "%s"}' % ("a1" * 2500),
+        '{"username": "carol", "email": "carol@example.com", "phoneNumber": "303", "password": "pass1234"}',
+    ]
+    dave = '{"username": "dave", "email": "dave@example.com", "phoneNumber": "304", "password": "pass1234"}'
+
+    report = await UserImport(db, chunk_size=2).run(parse_ndjson(_chunks("\n".join(rows).encode(), 4096)))
+
+    assert (report.rows, report.created, report.failed) == (3, 2, 1)
+    assert [(error.row, error.field) for error in report.errors] == [(2, "password")]
+
+    calls = []
+
+    async def broken_hash_many(passwords):
+        calls.append(passwords)
+        raise ValueError("hashing failed")
+
+    monkeypatch.setattr(password_hasher, "hash_many", broken_hash_many)
+    with pytest.raises(ValueError, match="hashing failed"):
+        await UserImport(db, chunk_size=1).run(parse_ndjson(_chunks(dave.encode())))
+    assert len(calls) == 1
@@ -0,0 +1,72 @@
+"""
+Benchmark suite for the auth and user endpoints.
+
+    python -m benchmarks
+    python -m benchmarks --save-baseline benchmarks/baselines/local.json
+    python -m benchmarks --baseline benchmarks/baselines/local.json --tolerance 0.25
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.harness import bench_database
+from benchmarks.report import compare, render, save_baseline
+
+
+async def run(args) -> list:
+    results = []
+    async with bench_database(args.url) as sessionmaker:
+        if args.suite in ("micro", "all"):
+            from benchmarks.micro import run_micro
+
+            results += await run_micro(sessionmaker, args.iterations)
+        if args.suite in ("load", "all"):
+            from benchmarks.load import run_load
+
+            results += await run_load(sessionmaker, args.requests, args.concurrency)
+        if args.suite in ("logging", "all"):
+            from benchmarks.logging_overhead import run_logging
+
+            results += await run_logging(sessionmaker, args.iterations)
+    if args.suite in ("coldstart", "all"):
+        from benchmarks.coldstart import run_coldstart
+
+        results += await asyncio.to_thread(run_coldstart, args.coldstarts)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("suite", nargs="?", choices=["micro", "load", "logging", "coldstart", "all"], default="all")
+    parser.add_argument("--url", help="database URL, defaults to a SQLite stand-in")
+    parser.add_argument("--iterations", type=int, default=500, help="calls per micro-benchmark")
+    parser.add_argument("--requests", type=int, default=100, help="requests per load scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--coldstarts", type=int, default=5, help="process launches per cold start benchmark")
+    parser.add_argument("--baseline", type=Path, help="fail on regression against this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--save-baseline", type=Path, help="write the results as a new baseline")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(render(results))
+    if args.suite in ("logging", "all"):
+        from benchmarks.logging_overhead import overhead_note
+
+        print(overhead_note(results))
+
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Compare per-row CRUDBase.create with the bulk create_many paths.
+
+    python -m benchmarks.bulk_insert --rows 20000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.crud.base import CRUDBase
+from app.db.base_class import Base
+from app.models.user import User, UserRole
+from app.schemas.user import UserCreateInDB
+
+crud = CRUDBase(User)
+
+
+def make_rows(prefix: str, count: int) -> list[UserCreateInDB]:
+    return [
+        UserCreateInDB(
+            username=f"bench{i}",
+            email=f"{prefix}{i}@example.com",
+            phoneNumber=f"{prefix}{i}",
+            passwordHash="x",
+            role=UserRole.INDIVIDUAL_USER,
+        )
+        for i in range(count)
+    ]
+
+
+async def run(url: str, rows: int, per_row: int) -> None:
+    engine = create_async_engine(url)
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    cases = [
+        ("create (per row)", per_row, None),
+        ("create_many (INSERT ... RETURNING)", rows, True),
+        ("create_many (returning=False / COPY)", rows, False),
+    ]
+    print(f"{'path':<40}{'rows':>8}{'seconds':>10}{'rows/s':>12}")
+    for name, count, returning in cases:
+        prefix = uuid.uuid4().hex[:8]
+        objs = make_rows(prefix, count)
+        async with sessionmaker() as db:
+            started = time.perf_counter()
+            if returning is None:
+                for obj in objs:
+                    await crud.create(db, obj_in=obj)
+            else:
+                await crud.create_many(db, objs_in=objs, returning=returning)
+            elapsed = time.perf_counter() - started
+
+            await db.execute(delete(User).where(User.email.like(f"{prefix}%")))
+            await db.commit()
+        print(f"{name:<40}{count:>8}{elapsed:>10.3f}{count / elapsed:>12.0f}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=settings.SQLALCHEMY_DATABASE_URI.unicode_string())
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--per-row", type=int, default=1000, help="rows for the per-row baseline")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.rows, args.per_row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Cold start of a worker: app import and time until /health answers."""
+import socket
+import subprocess
+import sys
+import time
+from typing import List
+
+import httpx
+
+from benchmarks.report import Result
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _import_app() -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], check=True, capture_output=True)
+    return time.perf_counter() - started
+
+
+def _first_response(timeout: float = 30.0) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError(f"uvicorn did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run_coldstart(iterations: int) -> List[Result]:
+    results = []
+    for name, measure in (("coldstart.import_app", _import_app), ("coldstart.first_response", _first_response)):
+        result = Result(name)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            try:
+                result.latencies.append(measure())
+            except Exception:
+                result.errors += 1
+        result.elapsed = time.perf_counter() - started
+        results.append(result)
+    return results
@@ -0,0 +1,130 @@
+import asyncio
+import itertools
+import os
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.crud.user import crud_user
+from app.db.base_class import Base
+from app.models.user import User, UserRole
+from benchmarks.report import Result
+
+PASSWORD = "bench1234"
+
+
+@dataclass
+class BenchUser:
+    id: int
+    email: str
+    phoneNumber: str
+
+
+@asynccontextmanager
+async def bench_database(url: Optional[str] = None) -> AsyncIterator[async_sessionmaker]:
+    """Session factory on `url`, or a throwaway SQLite file."""
+    path = None
+    if url is None:
+        fd, path = tempfile.mkstemp(suffix=".db", prefix="bench-")
+        os.close(fd)
+        url = f"sqlite+aiosqlite:///{path}"
+
+    engine = create_async_engine(url)
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    try:
+        yield async_sessionmaker(engine, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+        if path is not None:
+            os.remove(path)
+
+
+async def seed_users(
+    sessionmaker: async_sessionmaker, prefix: str, count: int, role: UserRole = UserRole.INDIVIDUAL_USER
+) -> List[BenchUser]:
+    # one bcrypt hash shared by every seeded user keeps seeding fast
+    password_hash = get_password_hash(PASSWORD)
+    rows = [
+        {
+            "username": f"{prefix}{i}",
+            "email": f"{prefix}{i}@example.com",
+            "phoneNumber": f"{prefix}{i}",
+            "passwordHash": password_hash,
+            "role": role.value,
+        }
+        for i in range(count)
+    ]
+    async with sessionmaker() as db:
+        users = await crud_user.create_many(db, objs_in=rows)
+    return [BenchUser(user.id, user.email, user.phoneNumber) for user in users]
+
+
+async def cleanup(sessionmaker: async_sessionmaker, prefix: str) -> None:
+    async with sessionmaker() as db:
+        await db.execute(delete(User).where(User.username.like(f"{prefix}%")))
+        await db.commit()
+
+
+def new_prefix() -> str:
+    return f"b{uuid.uuid4().hex[:8]}"
+
+
+async def run_concurrent(
+    name: str, call: Callable[[int], Awaitable[bool]], total: int, concurrency: int
+) -> Result:
+    """Run `call(i)` for i in range(total) on `concurrency` workers; falsy results count as errors."""
+    result = Result(name)
+    counter = itertools.count()
+
+    async def worker():
+        for i in counter:
+            if i >= total:
+                return
+            started = time.perf_counter()
+            try:
+                ok = await call(i)
+            except Exception:
+                ok = False
+            result.latencies.append(time.perf_counter() - started)
+            if not ok:
+                result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+async def run_serial(name: str, call: Callable[[int], Awaitable[object]], total: int) -> Result:
+    return await run_concurrent(name, _truthy(call), total, 1)
+
+
+def _truthy(call: Callable[[int], Awaitable[object]]) -> Callable[[int], Awaitable[bool]]:
+    async def wrapped(i: int) -> bool:
+        await call(i)
+        return True
+
+    return wrapped
+
+
+def override_db(sessionmaker: async_sessionmaker):
+    # mirrors app.db.session.get_db on the benchmark database
+    async def get_db() -> AsyncIterator[AsyncSession]:
+        async with sessionmaker() as session:
+            session.info["unit_of_work"] = settings.DB_UNIT_OF_WORK
+            yield session
+            if session.info.get("has_writes"):
+                await session.commit()
+
+    return get_db
@@ -0,0 +1,102 @@
+"""
+Load scenarios against the real ASGI app, in process through httpx.
+"""
+from typing import List
+
+import httpx
+
+from app.api.deps import get_db
+from app.core.config import settings
+from app.core.security import generate_tokens
+from app.main import app
+from app.models.user import UserRole
+from app.services.hashing import password_hasher
+from app.services.rate_limit import rate_limiter
+from benchmarks.harness import (
+    PASSWORD,
+    cleanup,
+    new_prefix,
+    override_db,
+    run_concurrent,
+    seed_users,
+)
+from benchmarks.report import Result
+
+API = settings.API_V1_STR
+
+
+async def run_load(sessionmaker, requests: int, concurrency: int) -> List[Result]:
+    prefix = new_prefix()
+    app.dependency_overrides[get_db] = override_db(sessionmaker)
+    password_hasher.start()
+    # every simulated client shares one address, measure the handlers instead
+    limiter_enabled, rate_limiter.enabled = rate_limiter.enabled, False
+    results = []
+    try:
+        users = await seed_users(sessionmaker, prefix, requests * 2)
+        (admin,) = await seed_users(sessionmaker, f"{prefix}a", 1, role=UserRole.SYSTEM_ADMIN)
+        admin_headers = {"Authorization": f"Bearer {generate_tokens(admin.id)[0]}"}
+        tokens = [generate_tokens(user.id) for user in users[:requests]]
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def signup(i):
+                response = await client.post(f"{API}/auth/signup", json={
+                    "email": f"{prefix}s{i}@example.com",
+                    "username": f"{prefix}s{i}",
+                    "phoneNumber": f"{prefix}s{i}",
+                    "password": PASSWORD,
+                    "password_confirm": PASSWORD,
+                })
+                return response.status_code == 200
+
+            async def login(i):
+                response = await client.post(
+                    f"{API}/auth/login", json={"email": users[i].email, "password": PASSWORD}
+                )
+                return response.status_code == 200
+
+            async def me(i):
+                response = await client.get(
+                    f"{API}/auth/me", headers={"Authorization": f"Bearer {tokens[i][0]}"}
+                )
+                return response.status_code == 200
+
+            async def refresh(i):
+                response = await client.post(
+                    f"{API}/auth/refresh", json={"refresh_token": tokens[i][1]}
+                )
+                return response.status_code == 200
+
+            async def admin_update(i):
+                user = users[i]
+                response = await client.put(
+                    f"{API}/users/{user.id}",
+                    json={"email": user.email, "username": f"{prefix}u{i}"},
+                    headers=admin_headers,
+                )
+                return response.status_code == 200
+
+            async def admin_delete(i):
+                response = await client.delete(
+                    f"{API}/users/{users[requests + i].id}", headers=admin_headers
+                )
+                return response.status_code == 200
+
+            scenarios = [
+                ("load.signup", signup),
+                ("load.login", login),
+                ("load.me", me),
+                ("load.refresh", refresh),
+                ("load.admin_update", admin_update),
+                ("load.admin_delete", admin_delete),
+            ]
+            for name, call in scenarios:
+                results.append(await run_concurrent(name, call, requests, concurrency))
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        rate_limiter.enabled = limiter_enabled
+        await password_hasher.close()
+        await cleanup(sessionmaker, prefix)
+    return results
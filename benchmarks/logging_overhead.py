@@ -0,0 +1,63 @@
+"""Cost of the logging pipeline, per call and on GET /auth/me."""
+import os
+from typing import List, Optional
+
+import httpx
+
+from app.api.deps import get_db
+from app.core.config import settings
+from app.core.logging import configure_logging, logger
+from app.core.security import generate_tokens
+from app.main import app
+from benchmarks.harness import cleanup, new_prefix, override_db, run_serial, seed_users
+from benchmarks.report import Result, percentile
+
+API = settings.API_V1_STR
+
+
+async def run_logging(sessionmaker, iterations: int) -> List[Result]:
+    prefix = new_prefix()
+    app.dependency_overrides[get_db] = override_db(sessionmaker)
+    devnull = open(os.devnull, "w")
+    configure_logging(stream=devnull, log_file=None)
+    results = []
+    try:
+        (user,) = await seed_users(sessionmaker, prefix, 1)
+        headers = {"Authorization": f"Bearer {generate_tokens(user.id)[0]}"}
+
+        async def info(i):
+            logger.info("Outbound response {} {} - Status {}", "GET", "https://example.com", 200)
+
+        async def below_level(i):
+            logger.opt(lazy=True).trace("Outbound request {}", lambda: "https://example.com")
+
+        results.append(await run_serial("logging.info_call", info, iterations))
+        results.append(await run_serial("logging.below_level_call", below_level, iterations))
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def me(i):
+                await client.get(f"{API}/auth/me", headers=headers)
+
+            results.append(await run_serial("logging.me_logged", me, iterations))
+            logger.disable("app")
+            try:
+                results.append(await run_serial("logging.me_silent", me, iterations))
+            finally:
+                logger.enable("app")
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        configure_logging()
+        devnull.close()
+        await cleanup(sessionmaker, prefix)
+    return results
+
+
+def overhead_note(results: List[Result]) -> Optional[str]:
+    by_name = {result.name: result for result in results}
+    logged, silent = by_name.get("logging.me_logged"), by_name.get("logging.me_silent")
+    if logged is None or silent is None:
+        return None
+    overhead = percentile(logged.latencies, 50) - percentile(silent.latencies, 50)
+    return f"logging overhead per request (p50 of GET /auth/me): {overhead * 1000:.3f} ms"
@@ -0,0 +1,71 @@
+"""
+Micro-benchmarks of the hot functions behind the auth and user routes.
+"""
+from datetime import timedelta
+from typing import List
+
+from app.api.deps import get_current_user
+from app.core.security import _create_token, decode_access_token, generate_tokens, verified_token_cache
+from app.crud.user import crud_user, principal_cache
+from app.schemas.user import UserUpdate
+from benchmarks.harness import cleanup, new_prefix, run_serial, seed_users
+from benchmarks.report import Result
+
+
+async def run_micro(sessionmaker, iterations: int) -> List[Result]:
+    prefix = new_prefix()
+    results = []
+    try:
+        users = await seed_users(sessionmaker, prefix, 100)
+        access_token, _ = generate_tokens(users[0].id)
+
+        async def create_token(i):
+            _create_token(users[i % 100].id, timedelta(minutes=60), "access")
+
+        async def tokens(i):
+            generate_tokens(users[i % 100].id)
+
+        async def decode(i):
+            decode_access_token(access_token)
+
+        async def decode_uncached(i):
+            verified_token_cache.clear()
+            decode_access_token(access_token)
+
+        results.append(await run_serial("micro._create_token", create_token, iterations))
+        results.append(await run_serial("micro.generate_tokens", tokens, iterations))
+        results.append(await run_serial("micro.decode_access_token", decode, iterations))
+        results.append(await run_serial("micro.decode_access_token_uncached", decode_uncached, iterations))
+
+        async with sessionmaker() as db:
+
+            async def search(i):
+                await crud_user.search(db, {"email": (users[i % 100].email, "=")}, single_result=True)
+
+            async def search_ilike(i):
+                await crud_user.search(db, {"username": (f"{prefix}{i % 10}", "ilike")}, limit=20)
+
+            async def current_user(i):
+                await get_current_user(token=access_token, db=db)
+
+            async def current_user_uncached(i):
+                principal_cache.clear()
+                await get_current_user(token=access_token, db=db)
+
+            async def update(i):
+                user = await crud_user.get(db, users[i % 100].id)
+                await crud_user.update(
+                    db, db_obj=user, obj_in=UserUpdate(email=user.email, username=f"{prefix}{i}")
+                )
+
+            results.append(await run_serial("micro.search_eq", search, iterations))
+            results.append(await run_serial("micro.search_ilike", search_ilike, iterations))
+            results.append(await run_serial("micro.get_current_user", current_user, iterations))
+            results.append(
+                await run_serial("micro.get_current_user_uncached", current_user_uncached, iterations)
+            )
+            results.append(await run_serial("micro.update", update, iterations))
+    finally:
+        principal_cache.clear()
+        await cleanup(sessionmaker, prefix)
+    return results
@@ -0,0 +1,77 @@
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile, `pct` in 0..100."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+@dataclass
+class Result:
+    name: str
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "throughput": round(self.count / self.elapsed, 2) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(self.latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 3),
+        }
+
+
+def render(results: List[Result]) -> str:
+    width = max([len("benchmark"), *(len(result.name) for result in results)]) + 2
+    lines = [f"{'benchmark':<{width}}{'count':>8}{'errors':>8}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for result in results:
+        s = result.summary()
+        lines.append(
+            f"{result.name:<{width}}{s['count']:>8}{s['errors']:>8}{s['throughput']:>12.1f}"
+            f"{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def save_baseline(results: List[Result], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({r.name: r.summary() for r in results}, indent=2, sort_keys=True))
+
+
+def compare(results: List[Result], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """
+    Regressions against `baseline`: p95 latency above, or throughput below,
+    the recorded value by more than `tolerance` (0.2 = 20%).
+    """
+    regressions = []
+    for result in results:
+        expected: Optional[Dict[str, float]] = baseline.get(result.name)
+        if expected is None:
+            continue
+        current = result.summary()
+        if expected["p95_ms"] and current["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result.name}: p95 {current['p95_ms']}ms > baseline {expected['p95_ms']}ms"
+            )
+        if expected["throughput"] and current["throughput"] < expected["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: {current['throughput']} ops/s < baseline {expected['throughput']} ops/s"
+            )
+        if current["errors"] > expected.get("errors", 0):
+            regressions.append(f"{result.name}: {current['errors']} errors")
+    return regressions
@@ -0,0 +1,34 @@
+"""Production server settings, each overridable by the environment variable next to it."""
+import os
+
+from app.core.cpu import available_cpus
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+# one async worker per core; bcrypt runs in a separate process pool per
+# worker, which splits the cores between the workers through
+# WEB_CONCURRENCY, see PASSWORD_HASH_WORKERS
+workers = int(os.getenv("WEB_CONCURRENCY") or available_cpus())
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# recycle workers to bound slow leaks; the jitter keeps them from restarting
+# all at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", str(max_requests // 10)))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def child_exit(server, worker):
+    # drop the samples of dead workers from the multiprocess metrics
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)